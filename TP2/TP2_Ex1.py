@@ -1,12 +1,28 @@
 from z3 import *
 import numpy as np
+import argparse
+import json
+import os
+import resource
+import shlex
+import subprocess
+import tempfile
+import time
+import tracemalloc
 
-n = int(input("Escreva o n: ")) #n=200 #teste
-k = int(input("Escreve o k: ")) #k=512 #teste
+#valores por omissao da linha de comandos (python TP2_Ex1.py --help)
+N_OMISSAO=200
+K_OMISSAO=512
+SEMENTE_OMISSAO=12345
 
-rng=np.random.default_rng(12345)
-z=rng.integers(low=0, high=2, size=n, dtype=np.uint8)
-s=rng.integers(low=0, high=2, size=k, dtype=np.uint8)
+#motor do Ponto 3: "auto" (decompoe por linhas quando x esta fixo, senao MaxSAT "oll"),
+#"optimize" (Optimize generico do z3) ou uma estrategia MaxSAT ("oll", "fu-malik", "linear")
+MOTOR_P3="auto"
+TIMEOUT_P3=60 #segundos; com timeout o MaxSAT devolve os limites lb/ub que tiver
+
+#quantos z' diferentes enumerar no Ponto 2 (0 desliga) e com que orcamento de tempo (segundos)
+ENUM_LIMITE_P2=0
+TIMEOUT_P2=60
 
 
 def produto_int(a, b):
@@ -74,7 +90,7 @@ def gate_prod(vec_x, x_bits):
     return (res, BoolVal(False))
 
 
-def build_smt_model(solver, n, lista):
+def build_smt_model(solver, n, lista, verboso=True):
     x_bits=[]
     for i in range(n):
         x_bits.append(BitVec(f'x_{i}', 1))
@@ -122,17 +138,995 @@ def build_smt_model(solver, n, lista):
 
         saidas.append(xor_wd2)
     
-    print(f"\nModelo SMT (re)construído com {type(solver)}.")
-    print(f"  - {n} variáveis 'x_bits' criadas.")
-    print(f"  - {len(falhas)} variáveis 'falhas' criadas.")
-    print(f"  - {len(saidas)} variáveis 'saidas' criadas.")
+    if verboso:
+        print(f"\nModelo SMT (re)construído com {type(solver)}.")
+        print(f"  - {n} variáveis 'x_bits' criadas.")
+        print(f"  - {len(falhas)} variáveis 'falhas' criadas.")
+        print(f"  - {len(saidas)} variáveis 'saidas' criadas.")
     
     #retorna as variaveis que precisamos de usar fora
     return x_bits, falhas, saidas, x_input
 
 
+#--- MaxSAT para o Ponto 3 ---
+#as restricoes do circuito sao 'hard' e cada bandeira de falha e uma clausula 'soft' unitaria
+#(queremos que seja True). o custo e o numero de soft violadas, logo falhas = total - custo
+
+def progresso_maxsat(lb, ub, t):
+    print(f"  [maxsat] t={t:7.2f}s  lb={lb}  ub={ub}")
+
+def contar_verdadeiras(m, lits):
+    return sum(1 for l in lits if is_true(m.eval(l, model_completion=True)))
+
+def check_com_tempo(solver, inicio, timeout, assumptions=()):
+    if timeout is not None:
+        resto=timeout-(time.time()-inicio)
+        if resto<=0:
+            return unknown
+        solver.set("timeout", max(1, int(resto*1000)))
+    return solver.check(*assumptions)
+
+def maxsat_linear(solver, soft, inicio, timeout, progresso):
+    #SAT-UNSAT: cada modelo da um lb, e exigimos pelo menos lb+1 soft ate dar unsat
+    lb, ub, melhor=0, len(soft), None
+    while lb<ub:
+        res=check_com_tempo(solver, inicio, timeout)
+        if res==sat:
+            melhor=solver.model()
+            lb=contar_verdadeiras(melhor, soft)
+            progresso(lb, ub, time.time()-inicio)
+            if lb<ub:
+                #cardinalidade nativa do z3 (pseudo-booleana), adicionada de forma incremental
+                solver.add(AtLeast(*soft, lb+1))
+        elif res==unsat:
+            if melhor is None:
+                #unsat antes de qualquer modelo: as hard sao insatisfaziveis
+                return lb, -1, melhor
+            ub=lb
+            progresso(lb, ub, time.time()-inicio)
+        else:
+            break
+    return lb, ub, melhor
+
+def maxsat_fu_malik(solver, soft, inicio, timeout, progresso):
+    #cada soft i tem um seletor; ao aparecer num core e relaxada com uma nova variavel r
+    #e as novas r's de cada core ficam sob AtMostOne
+    total=len(soft)
+    clausulas=[[l] for l in soft]
+    seletores=[]
+    for i, l in enumerate(soft):
+        a=Bool(f'fm_sel_{i}_0')
+        solver.add(Implies(a, l))
+        seletores.append(a)
+    indice={a.get_id(): i for i, a in enumerate(seletores)}
+
+    lb, custo, melhor=0, 0, None
+    res=check_com_tempo(solver, inicio, timeout)
+    if res!=sat:
+        return lb, (total if res==unknown else -1), melhor
+    melhor=solver.model()
+    lb=contar_verdadeiras(melhor, soft)
+    progresso(lb, total, time.time()-inicio)
+
+    iteracao=0
+    while lb<total-custo:
+        res=check_com_tempo(solver, inicio, timeout, seletores)
+        if res==sat:
+            melhor=solver.model()
+            lb=contar_verdadeiras(melhor, soft)
+            progresso(lb, total-custo, time.time()-inicio)
+            break
+        if res==unknown:
+            break
+        core=solver.unsat_core()
+        iteracao+=1
+        custo+=1
+        novas_r=[]
+        for a in core:
+            i=indice.pop(a.get_id())
+            r=Bool(f'fm_r_{i}_{iteracao}')
+            novas_r.append(r)
+            clausulas[i].append(r)
+            a_novo=Bool(f'fm_sel_{i}_{iteracao}')
+            solver.add(Implies(a_novo, Or(clausulas[i])))
+            seletores[i]=a_novo
+            indice[a_novo.get_id()]=i
+        solver.add(AtMost(*novas_r, 1))
+        progresso(lb, total-custo, time.time()-inicio)
+    return lb, total-custo, melhor
+
+def maxsat_oll(solver, soft, inicio, timeout, progresso):
+    #OLL com pesos unitarios: cada core da origem a um totalizador o_j <-> "pelo menos j
+    #literais do core sao falsos" e Not(o_{j+1}) entra como nova soft quando Not(o_j) aparece num core
+    total=len(soft)
+    lb, custo, melhor=0, 0, None
+    res=check_com_tempo(solver, inicio, timeout)
+    if res!=sat:
+        return lb, (total if res==unknown else -1), melhor
+    melhor=solver.model()
+    lb=contar_verdadeiras(melhor, soft)
+    progresso(lb, total, time.time()-inicio)
+
+    ativas=list(soft)
+    somas={}
+    n_core=0
+    while lb<total-custo:
+        res=check_com_tempo(solver, inicio, timeout, ativas)
+        if res==sat:
+            melhor=solver.model()
+            lb=contar_verdadeiras(melhor, soft)
+            progresso(lb, total-custo, time.time()-inicio)
+            break
+        if res==unknown:
+            break
+        core=list(solver.unsat_core())
+        custo+=1
+        nucleo=set(c.get_id() for c in core)
+        ativas=[l for l in ativas if l.get_id() not in nucleo]
+        for c in core:
+            if c.get_id() in somas:
+                lits, j, tag=somas.pop(c.get_id())
+                if j+1<=len(lits):
+                    o=Bool(f'oll_{tag}_{j+1}')
+                    solver.add(o==AtLeast(*[Not(l) for l in lits], j+1))
+                    somas[Not(o).get_id()]=(lits, j+1, tag)
+                    ativas.append(Not(o))
+        if len(core)>1:
+            n_core+=1
+            o=Bool(f'oll_{n_core}_2')
+            solver.add(o==AtLeast(*[Not(l) for l in core], 2))
+            somas[Not(o).get_id()]=(core, 2, n_core)
+            ativas.append(Not(o))
+        progresso(lb, total-custo, time.time()-inicio)
+    return lb, total-custo, melhor
+
+ESTRATEGIAS_MAXSAT={
+    "linear": maxsat_linear,
+    "fu-malik": maxsat_fu_malik,
+    "oll": maxsat_oll,
+}
+
+def maxsat_falhas(solver, falhas, estrategia="oll", timeout=None, progresso=progresso_maxsat):
+    #devolve (lb, ub, modelo); lb==ub significa otimo provado, ub==-1 significa hard insatisfazivel
+    if estrategia not in ESTRATEGIAS_MAXSAT:
+        raise ValueError(f"Estratégia MaxSAT desconhecida: {estrategia}")
+    inicio=time.time()
+    return ESTRATEGIAS_MAXSAT[estrategia](solver, list(falhas), inicio, timeout, progresso)
+
+
+#--- Decomposicao por linhas do Ponto 3 ---
+#com x fixo, as paridades a.x, b.x, c.x sao constantes e cada linha so partilha com as outras
+#os bits de x; o problema parte-se em n subproblemas de 3 bandeiras que se resolvem em forma fechada
+
+def x_esta_fixo(x_fixo, n):
+    return x_fixo is not None and len(x_fixo)==n and all(int(v) in (0, 1) for v in x_fixo)
+
+def paridades_linhas(lista, x):
+    o=np.array([l[0] for l in lista], dtype=np.uint8)
+    A=np.array([l[1] for l in lista], dtype=np.uint8)
+    B=np.array([l[2] for l in lista], dtype=np.uint8)
+    C=np.array([l[3] for l in lista], dtype=np.uint8)
+    x=np.asarray(x, dtype=np.int64)
+    return o, (A@x)%2, (B@x)%2, (C@x)%2
+
+def linha_admissivel(o, a_x, b_x, c_x, f1, f2, f3):
+    #mesma semantica das gates: qualquer falha 'and' propaga d ate a saida (maj e xor_B),
+    #e com d a saida fica livre; sem falhas a saida e o ^ a.x ^ (b.x & c.x) e tem de ser 0
+    if f1 or f2 or f3:
+        return True
+    return (int(o)^int(a_x)^(int(b_x)&int(c_x)))==0
+
+def maximizar_linha(o, a_x, b_x, c_x):
+    melhor, escolha=-1, None
+    for f in ((True, True, True), (True, True, False), (True, False, True), (False, True, True),
+              (True, False, False), (False, True, False), (False, False, True), (False, False, False)):
+        if linha_admissivel(o, a_x, b_x, c_x, *f) and sum(f)>melhor:
+            melhor, escolha=sum(f), f
+    return melhor, escolha
+
+def maximizar_falhas_decomposto(lista, x_fixo):
+    #devolve (total, escolhas) com escolhas[i]=(and1_i, and2_i, and3_i), ou (None, i) se a linha i for impossivel
+    o, a_x, b_x, c_x=paridades_linhas(lista, x_fixo)
+    total=0
+    escolhas=[]
+    for i in range(len(lista)):
+        melhor, escolha=maximizar_linha(o[i], a_x[i], b_x[i], c_x[i])
+        if escolha is None:
+            return None, i
+        total+=melhor
+        escolhas.append(escolha)
+    return total, escolhas
+
+
+
+#--- Simulacao concreta com falhas (bit-paralela em NumPy) ---
+#cada palavra uint64 guarda 64 padroes de falha; as gates seguem gate_and/gate_maj/gate_xor.
+#no modelo SMT uma 'and' com falha fica livre (d=True); aqui escolhe-se o valor concreto:
+#"flip" (complementa o valor correto), "0" ou "1" (stuck-at)
+
+MODELOS_FALHA=("flip", "0", "1")
+
+def empacotar_padroes(padroes):
+    #(P, m) bool -> (m, W) uint64 com o padrao p no bit p%64 da palavra p//64
+    padroes=np.asarray(padroes, dtype=bool)
+    P=padroes.shape[0]
+    W=(P+63)//64
+    octetos=np.packbits(padroes.T, axis=1, bitorder='little')
+    completo=np.zeros((padroes.shape[1], W*8), dtype=np.uint8)
+    completo[:, :octetos.shape[1]]=octetos
+    return completo.view(np.uint64)
+
+def desempacotar_padroes(palavras, P):
+    #(m, W) uint64 -> (P, m) bool
+    bits=np.unpackbits(np.ascontiguousarray(palavras).view(np.uint8), axis=1, bitorder='little')
+    return bits[:, :P].T.astype(bool)
+
+def palavra_constante(bits):
+    #vetor de bits (m,) -> (m, 1) uint64 com todos os bits a 0 ou a 1
+    return np.where(np.asarray(bits, dtype=bool), np.uint64(0xFFFFFFFFFFFFFFFF), np.uint64(0))[:, None]
+
+def simular_palavras(lista, x, F, modelo="flip"):
+    #F: (3n, W) uint64 ja empacotado; devolve (saida, d) como palavras (n, W)
+    if modelo not in MODELOS_FALHA:
+        raise ValueError(f"Modelo de falha desconhecido: {modelo}")
+    n_linhas=len(lista)
+    assert F.shape[0]==3*n_linhas
+    F=F.reshape(n_linhas, 3, -1)
+
+    o, a_x, b_x, c_x=paridades_linhas(lista, x)
+    bc=palavra_constante(b_x & c_x)
+
+    ands=[]
+    for j in range(3):
+        f=F[:, j, :]
+        if modelo=="flip":
+            ands.append(bc^f)
+        elif modelo=="0":
+            ands.append(bc&~f)
+        else:
+            ands.append(bc|f)
+    a1, a2, a3=ands
+
+    maj=(a1&a2)|(a1&a3)|(a2&a3)
+    saida=palavra_constante(o)^palavra_constante(a_x)^maj
+    d=F[:, 0, :]|F[:, 1, :]|F[:, 2, :]
+    return saida, d
+
+def simular_circuito(lista, x, padroes, modelo="flip"):
+    #padroes: (P, 3n) bool na ordem de 'falhas' (and1_0, and2_0, and3_0, and1_1, ...)
+    #devolve (saidas, d) com forma (P, n): valor concreto da saida e bandeira d de cada linha
+    padroes=np.asarray(padroes, dtype=bool)
+    saida, d=simular_palavras(lista, x, empacotar_padroes(padroes), modelo)
+    return desempacotar_padroes(saida, len(padroes)), desempacotar_padroes(d, len(padroes))
+
+def contar_bits(palavras, P):
+    #popcount dos primeiros P bits de um vetor (W,) de uint64
+    return int(np.unpackbits(palavras.view(np.uint8), bitorder='little')[:P].sum())
+
+def palavras_aleatorias(num_padroes, num_bandeiras, prob, rng_padroes):
+    #padroes aleatorios (cada bandeira com probabilidade prob) gerados ja empacotados,
+    #sem passar pela matriz (P, 3n) transposta
+    W=(num_padroes+63)//64
+    if prob==0.5:
+        F=rng_padroes.integers(0, 2**64, size=(num_bandeiras, W), dtype=np.uint64, endpoint=False)
+    else:
+        bits=rng_padroes.random((num_bandeiras, W*64), dtype=np.float32)<prob
+        F=np.packbits(bits, axis=1, bitorder='little').view(np.uint64)
+    if num_padroes%64:
+        F[:, -1]&=np.uint64((1<<(num_padroes%64))-1)
+    return F
+
+def padroes_exaustivos(indices, num_bandeiras, bloco=1<<16):
+    #todos os 2^len(indices) padroes sobre as bandeiras 'indices' (as restantes a 0), por blocos
+    m=len(indices)
+    total=1<<m
+    for inicio in range(0, total, bloco):
+        ids=np.arange(inicio, min(total, inicio+bloco), dtype=np.uint64)
+        padroes=np.zeros((len(ids), num_bandeiras), dtype=bool)
+        for j, idx in enumerate(indices):
+            padroes[:, idx]=((ids>>np.uint64(j))&np.uint64(1)).astype(bool)
+        yield padroes
+
+def campanha_palavras(lista, x, blocos, modelo="flip"):
+    #blocos de (P, F) com F ja empacotado; acumula quantos padroes dao saida 0^n e quantos
+    #alteram pelo menos uma saida em relacao ao circuito sem falhas (tudo sobre as palavras)
+    sem_falhas, _=simular_palavras(lista, x, np.zeros((3*len(lista), 1), dtype=np.uint64), modelo)
+    total, zeros, efetivos=0, 0, 0
+    for P, F in blocos:
+        saida, _=simular_palavras(lista, x, F, modelo)
+        total+=P
+        zeros+=contar_bits(~np.bitwise_or.reduce(saida, axis=0), P)
+        efetivos+=contar_bits(np.bitwise_or.reduce(saida^sem_falhas, axis=0), P)
+    return {"padroes": total, "saida_zero": zeros, "efetivos": efetivos}
+
+def campanha_falhas(lista, x, blocos, modelo="flip"):
+    #o mesmo, para blocos de padroes (P, 3n) bool (p.ex. de padroes_exaustivos)
+    return campanha_palavras(lista, x, ((len(p), empacotar_padroes(p)) for p in blocos), modelo)
+
+def campanha_aleatoria(lista, x, num_padroes, prob=0.5, semente=0, modelo="flip", bloco=1<<20):
+    rng_padroes=np.random.default_rng(semente)
+    tamanhos=[min(bloco, num_padroes-i) for i in range(0, num_padroes, bloco)]
+    blocos=((P, palavras_aleatorias(P, 3*len(lista), prob, rng_padroes)) for P in tamanhos)
+    return campanha_palavras(lista, x, blocos, modelo)
+
+def validar_modelo_smt(lista, m, x_bits, falhas, saidas):
+    #compara um modelo do z3 com a simulacao concreta: nas linhas sem d a saida do modelo
+    #tem de coincidir com o circuito (qualquer modelo de falha da o mesmo valor sem d);
+    #devolve a lista de linhas em desacordo
+    x=ler_x(m, x_bits)
+    padrao=np.array([[is_true(m.eval(f, model_completion=True)) for f in falhas]])
+    sim, d=simular_circuito(lista, x, padrao)
+    erradas=[]
+    for i, (w, _) in enumerate(saidas):
+        if not d[0, i] and m.eval(w, model_completion=True).as_long()!=int(sim[0, i]):
+            erradas.append(i)
+    return erradas
+
+
+#--- Enumeracao de todos os z' (Ponto 2) ---
+#os bloqueios sao projetados sobre x_bits: cada z' aparece uma vez, independentemente de
+#quantas combinacoes de bandeiras de falha o explicam
+
+def ler_x(m, x_bits):
+    return np.array([m.eval(b, model_completion=True).as_long() for b in x_bits], dtype=np.uint8)
+
+def bloquear_x(solver, x_bits, valores):
+    solver.add(Or([x_bits[i]!=int(valores[i]) for i in range(len(x_bits))]))
+
+def enumerar_z_falsos(n, lista, z_excluir=None, limite=None, tempo=None):
+    #gerador preguicoso; o valor de retorno (StopIteration.value) e sat/unsat/unknown:
+    #unsat = enumeracao completa, sat = parou no limite, unknown = esgotou o tempo
+    solver=Solver()
+    x_bits, _=construir_ponto2(solver, n, lista, z_excluir, verboso=False)
+    inicio=time.time()
+    encontrados=0
+    while limite is None or encontrados<limite:
+        res=check_com_tempo(solver, inicio, tempo)
+        if res!=sat:
+            return res
+        z_falso=ler_x(solver.model(), x_bits)
+        bloquear_x(solver, x_bits, z_falso)
+        encontrados+=1
+        yield z_falso
+    return sat
+
+def contar_ate(solver, x_bits, limiar, inicio, tempo):
+    #conta ate limiar+1 solucoes (projetadas em x) dentro de um push/pop
+    solver.push()
+    conta=0
+    while conta<=limiar:
+        res=check_com_tempo(solver, inicio, tempo)
+        if res==unknown:
+            solver.pop()
+            return None
+        if res==unsat:
+            break
+        bloquear_x(solver, x_bits, ler_x(solver.model(), x_bits))
+        conta+=1
+    solver.pop()
+    return conta
+
+def contar_z_falsos_aprox(n, lista, z_excluir=None, limiar=64, repeticoes=5, semente=0, tempo=None):
+    #contagem aproximada por hashing XOR (estilo ApproxMC): acrescentam-se restricoes de paridade
+    #aleatorias sobre x_bits ate a celula ter <= limiar solucoes e estima-se conta * 2^m;
+    #uma repeticao que acabe numa celula vazia (m>0) e descartada, como no ApproxMCCore;
+    #devolve a mediana das repeticoes aceites, ou None se o tempo acabar ou se todas
+    #forem descartadas
+    solver=Solver()
+    x_bits, _=construir_ponto2(solver, n, lista, z_excluir, verboso=False)
+    rng_xor=np.random.default_rng(semente)
+    inicio=time.time()
+
+    estimativas=[]
+    for _ in range(repeticoes):
+        solver.push()
+        for m in range(n+1):
+            conta=contar_ate(solver, x_bits, limiar, inicio, tempo)
+            if conta is None:
+                solver.pop()
+                return None
+            if conta<=limiar:
+                #celula vazia com m>0: a repeticao nao da estimativa e e descartada
+                if conta>0 or m==0:
+                    estimativas.append(conta*(2**m))
+                break
+            coefs=rng_xor.integers(0, 2, size=n)
+            termos=[x_bits[i] for i in range(n) if coefs[i]]
+            paridade=BitVecVal(int(rng_xor.integers(0, 2)), 1)
+            for t in termos:
+                paridade=paridade^t
+            solver.add(paridade==BitVecVal(0,1))
+        solver.pop()
+
+    if not estimativas:
+        return None
+    return int(np.median(estimativas))
+
+
+#--- Exportacao direta para CNF/DIMACS (Tseitin) ---
+#o mesmo circuito de build_smt_model, mas cada gate e codificada em clausulas sem passar
+#pelo bit-blasting do z3. os literais sao inteiros DIMACS; as constantes (paridades com
+#coeficientes todos a 0) sao dobradas em True/False antes de gerar clausulas
+
+class CNF:
+    def __init__(self, xor_clausulas=False):
+        self.num_vars=0
+        self.clausulas=[]
+        self.xclausulas=[] #formato CryptoMiniSat: "x l1 l2 ... 0" <-> l1 ^ l2 ^ ... = 1
+        self.nomes={}
+        self.xor_clausulas=xor_clausulas
+
+    def nova_var(self, nome=None):
+        self.num_vars+=1
+        if nome is not None:
+            self.nomes[self.num_vars]=nome
+        return self.num_vars
+
+    def add(self, clausula):
+        #literais constantes: True satisfaz a clausula, False desaparece
+        lits=[]
+        for l in clausula:
+            if l is True:
+                return
+            if l is not False:
+                lits.append(l)
+        self.clausulas.append(lits)
+
+    def dimacs(self):
+        linhas=[f"c TP2 Ex1: {len(self.nomes)} variaveis com nome"]
+        for v, nome in self.nomes.items():
+            linhas.append(f"c var {v} {nome}")
+        linhas.append(f"p cnf {self.num_vars} {len(self.clausulas)+len(self.xclausulas)}")
+        for c in self.clausulas:
+            linhas.append(" ".join(map(str, c))+" 0")
+        for c in self.xclausulas:
+            linhas.append("x"+" ".join(map(str, c))+" 0")
+        return "\n".join(linhas)+"\n"
+
+    def escrever(self, caminho):
+        with open(caminho, "w") as f:
+            f.write(self.dimacs())
+
+def neg(l):
+    if l is True or l is False:
+        return not l
+    return -l
+
+def cnf_xor2(cnf, a, b):
+    if a is False: return b
+    if b is False: return a
+    if a is True: return neg(b)
+    if b is True: return neg(a)
+    t=cnf.nova_var()
+    cnf.add([-t, a, b]); cnf.add([-t, -a, -b])
+    cnf.add([t, -a, b]); cnf.add([t, a, -b])
+    return t
+
+def cnf_paridade(cnf, lits):
+    #gate_prod: so entram os x_i com coeficiente 1 (os termos 0 & x_i sao mortos)
+    if not lits:
+        return False
+    if len(lits)==1:
+        return lits[0]
+    if cnf.xor_clausulas:
+        t=cnf.nova_var()
+        cnf.xclausulas.append([-t]+lits)
+        return t
+    res=lits[0]
+    for l in lits[1:]:
+        res=cnf_xor2(cnf, res, l)
+    return res
+
+def cnf_and_falha(cnf, p, q, f, nome):
+    #gate_and: f v (w <-> p & q)
+    w=cnf.nova_var(nome)
+    cnf.add([f, -w, p]); cnf.add([f, -w, q]); cnf.add([f, w, neg(p), neg(q)])
+    return w
+
+def cnf_maj(cnf, w1, w2, w3, d, nome):
+    #gate_maj: d1 v d2 v d3 v (m <-> maj(w1, w2, w3))
+    m=cnf.nova_var(nome)
+    for a, b in ((w1, w2), (w1, w3), (w2, w3)):
+        cnf.add(d+[-m, a, b])
+        cnf.add(d+[m, -a, -b])
+    return m
+
+def cnf_xor_guardado(cnf, a, b, d, nome):
+    #gate_xor com d nao constante: d v (w <-> a ^ b)
+    w=cnf.nova_var(nome)
+    cnf.add(d+[-w, a, b]); cnf.add(d+[-w, neg(a), neg(b)])
+    cnf.add(d+[w, neg(a), b]); cnf.add(d+[w, a, neg(b)])
+    return w
+
+def construir_cnf(n, lista, xor_clausulas=False):
+    cnf=CNF(xor_clausulas)
+    x_bits=[cnf.nova_var(f'x_{i}') for i in range(n)]
+    falhas=[]
+    saidas=[]
+    for i in range(n):
+        o, a, b, c=lista[i]
+        p_a=cnf_paridade(cnf, [x_bits[j] for j in range(n) if a[j]])
+        p_b=cnf_paridade(cnf, [x_bits[j] for j in range(n) if b[j]])
+        p_c=cnf_paridade(cnf, [x_bits[j] for j in range(n) if c[j]])
+
+        fs=[cnf.nova_var(f'and{j}_{i}') for j in (1, 2, 3)]
+        falhas.extend(fs)
+        ws=[cnf_and_falha(cnf, p_b, p_c, fs[j], f'and{j+1}_w_{i}') for j in range(3)]
+        m=cnf_maj(cnf, *ws, fs, f'maj_w_{i}')
+
+        #xor_A nao tem d: o seu valor e o ^ (a.x), que e apenas um literal
+        xor_a=neg(p_a) if o else p_a
+        saidas.append(cnf_xor_guardado(cnf, xor_a, m, fs, f'xor_B_{i}'))
+    return cnf, x_bits, falhas, saidas
+
+def cnf_ponto2(n, lista, z, xor_clausulas=False):
+    cnf, x_bits, falhas, saidas=construir_cnf(n, lista, xor_clausulas)
+    for w in saidas:
+        cnf.add([-w])
+    cnf.add(list(falhas))
+    cnf.add([-x_bits[i] if z[i] else x_bits[i] for i in range(n)])
+    return cnf
+
+def cnf_ponto3(n, lista, z, xor_clausulas=False):
+    cnf, x_bits, _, saidas=construir_cnf(n, lista, xor_clausulas)
+    for w in saidas:
+        cnf.add([-w])
+    for i in range(n):
+        cnf.add([x_bits[i] if z[i] else -x_bits[i]])
+    return cnf
+
+def ler_saida_sat(texto):
+    #formato de competicao: "s SATISFIABLE" + linhas "v ..."
+    estado=unknown
+    atribuicao={}
+    for linha in texto.splitlines():
+        if linha.startswith("s "):
+            if "UNSATISFIABLE" in linha:
+                estado=unsat
+            elif "SATISFIABLE" in linha:
+                estado=sat
+        elif linha.startswith("v "):
+            for l in linha[2:].split():
+                l=int(l)
+                if l!=0:
+                    atribuicao[abs(l)]=l>0
+    return estado, atribuicao
+
+def resolver_cnf(cnf, comando=None, timeout=None):
+    #comando: solver SAT externo que le DIMACS de um ficheiro (p.ex. "cryptominisat5", "kissat");
+    #sem comando resolve-se a mesma CNF com o SAT do z3 (so para validacao)
+    if comando is not None:
+        with tempfile.NamedTemporaryFile("w", suffix=".cnf", delete=False) as f:
+            f.write(cnf.dimacs())
+        try:
+            proc=subprocess.run(shlex.split(comando)+[f.name], capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return unknown, {}
+        finally:
+            os.unlink(f.name)
+        return ler_saida_sat(proc.stdout)
+
+    solver=SolverFor("QF_FD")
+    if timeout is not None:
+        solver.set("timeout", int(timeout*1000))
+    if not cnf.xclausulas:
+        #o leitor DIMACS do z3 nomeia a variavel i como k!i
+        with tempfile.NamedTemporaryFile("w", suffix=".cnf", delete=False) as f:
+            f.write(cnf.dimacs())
+        try:
+            solver.from_file(f.name)
+        finally:
+            os.unlink(f.name)
+        estado=solver.check()
+        if estado!=sat:
+            return estado, {}
+        m=solver.model()
+        return estado, {int(d.name()[2:]): is_true(m[d]) for d in m.decls()}
+
+    vs=[None]+[Bool(f'v{i}') for i in range(1, cnf.num_vars+1)]
+    lit=lambda l: vs[l] if l>0 else Not(vs[-l])
+    for c in cnf.clausulas:
+        solver.add(Or([lit(l) for l in c]))
+    for c in cnf.xclausulas:
+        termos=[lit(l) for l in c]
+        res=termos[0]
+        for t in termos[1:]:
+            res=Xor(res, t)
+        solver.add(res)
+    estado=solver.check()
+    if estado!=sat:
+        return estado, {}
+    m=solver.model()
+    return estado, {i: is_true(m.eval(vs[i], model_completion=True)) for i in range(1, cnf.num_vars+1)}
+
+SAT_INTERNO="interno" #--sat-solver interno: a CNF e resolvida pelo SAT do z3
+
+def interpretar_solucao_cnf(cnf, atribuicao, n):
+    #traduz a atribuicao para os nomes de build_smt_model: o vetor x_bits e as falhas ativas
+    valores={nome: atribuicao.get(v, False) for v, nome in cnf.nomes.items()}
+    x=np.array([int(valores[f'x_{i}']) for i in range(n)], dtype=np.uint8)
+    falhas=[nome for nome, v in valores.items() if nome.startswith('and') and '_w_' not in nome and v]
+    return x, falhas
+
+
+#--- Netlist intermedia (hash-consing, constant folding, CSE, remocao de gates mortas) ---
+#as gates sao primeiro construidas aqui e so depois emitidas para o z3. cada no guarda o
+#conjunto de bandeiras de falha no seu cone: os nos puros (sem falhas) podem ser dobrados
+#e partilhados livremente; os restantes mantem a semantica Or(d, w==...) das gates
+
+class Netlist:
+    def __init__(self):
+        self.nos=[]        #(op, args, nome); os ids crescem por ordem topologica
+        self.cones=[]      #bandeiras de falha no cone de cada no
+        self.tabela={}
+
+    def no(self, op, args, nome=None, cone=frozenset()):
+        chave=(op, args)
+        if chave in self.tabela:
+            return self.tabela[chave]
+        self.nos.append((op, args, nome))
+        self.cones.append(cone)
+        self.tabela[chave]=len(self.nos)-1
+        return len(self.nos)-1
+
+    def const(self, v):
+        return self.no('const', (int(v),))
+
+    def var(self, i):
+        return self.no('x', (i,))
+
+    def valor(self, a):
+        op, args, _=self.nos[a]
+        return args[0] if op=='const' else None
+
+    def puro(self, *ids):
+        return all(not self.cones[a] for a in ids)
+
+    def cone(self, *ids):
+        return frozenset().union(*(self.cones[a] for a in ids))
+
+    def xor(self, a, b, nome=None):
+        va, vb=self.valor(a), self.valor(b)
+        if va==0: return b
+        if vb==0: return a
+        if va is not None and vb is not None: return self.const(va^vb)
+        if a==b and self.puro(a): return self.const(0)
+        return self.no('xor', tuple(sorted((a, b))), nome, self.cone(a, b))
+
+    def and_(self, a, b, nome=None):
+        va, vb=self.valor(a), self.valor(b)
+        if va==0 or vb==0: return self.const(0)
+        if va==1: return b
+        if vb==1: return a
+        if a==b and self.puro(a): return a
+        return self.no('and', tuple(sorted((a, b))), nome, self.cone(a, b))
+
+    def or_(self, a, b, nome=None):
+        va, vb=self.valor(a), self.valor(b)
+        if va==1 or vb==1: return self.const(1)
+        if va==0: return b
+        if vb==0: return a
+        if a==b and self.puro(a): return a
+        return self.no('or', tuple(sorted((a, b))), nome, self.cone(a, b))
+
+    def maj(self, a, b, c, nome=None):
+        args=tuple(sorted((a, b, c)))
+        if self.puro(*args):
+            for u, v, w in ((args[0], args[1], args[2]), (args[1], args[2], args[0]), (args[0], args[2], args[1])):
+                if u==v: return u
+                if self.valor(u)==0: return self.and_(v, w)
+                if self.valor(u)==1: return self.or_(v, w)
+        return self.no('maj', args, nome, self.cone(*args))
+
+    def falha(self, base, bandeira, nome):
+        #gate 'and' com bandeira de falha: o valor e o da base, mas fica livre se a bandeira for True
+        return self.no('falha', (base, bandeira), nome, self.cones[base] | {bandeira})
+
+    def vivos(self, saidas):
+        #remocao de gates mortas: so os nos no cone das saidas sao emitidos
+        marcados=set()
+        pilha=list(saidas)
+        while pilha:
+            a=pilha.pop()
+            if a in marcados:
+                continue
+            marcados.add(a)
+            op, args, _=self.nos[a]
+            if op in ('xor', 'and', 'or', 'maj'):
+                pilha.extend(args)
+            elif op=='falha':
+                pilha.append(args[0])
+        return marcados
+
+    def contar_gates(self, ids):
+        return sum(1 for a in ids if self.nos[a][0] not in ('const', 'x'))
+
+def cse_paridades(M, limiar=2, max_novas=None):
+    #CSE das paridades (algoritmo guloso de Paar): enquanto houver um par de colunas que
+    #aparece junto em >= limiar linhas, cria-se uma coluna nova com o XOR do par.
+    #devolve (pares, M') onde a coluna c+k de M' e o XOR das colunas pares[k].
+    #as contagens sao float32 (exatas ate 2^24) para os produtos irem para o BLAS
+    linhas, cols=M.shape
+    if max_novas is None:
+        max_novas=min(4*cols, 2048)
+    cap=cols+max_novas
+    A=np.zeros((linhas, cap), dtype=np.float32)
+    A[:, :cols]=M
+    C=np.zeros((cap, cap), dtype=np.float32)
+    C[:cols, :cols]=A[:, :cols].T@A[:, :cols]
+    np.fill_diagonal(C, 0)
+    #maximo (e onde) de cada linha de C, mantidos incrementalmente para nao varrer C inteira
+    rmax=np.zeros(cap, dtype=np.float32)
+    rarg=np.zeros(cap, dtype=np.int64)
+    rmax[:cols]=C[:cols, :cols].max(axis=1)
+    rarg[:cols]=C[:cols, :cols].argmax(axis=1)
+    pares=[]
+    total=cols
+    while len(pares)<max_novas:
+        i=int(np.argmax(rmax[:total]))
+        j=int(rarg[i])
+        if rmax[i]<limiar:
+            break
+        nova=A[:, i]*A[:, j]
+        A[:, i]-=nova
+        A[:, j]-=nova
+        A[:, total]=nova
+        pares.append((i, j))
+        total+=1
+        novas=(i, j, total-1)
+        for c in novas:
+            C[c, :total]=A[:, c]@A[:, :total]
+            C[:total, c]=C[c, :total]
+            C[c, c]=0
+        #as colunas i e j so podem descer; a coluna nova pode passar a ser o maximo de uma linha
+        afetadas=np.flatnonzero((rarg[:total]==i) | (rarg[:total]==j))
+        for r in set(afetadas.tolist()) | set(novas):
+            rmax[r]=C[r, :total].max()
+            rarg[r]=C[r, :total].argmax()
+        melhor=C[:total, total-1]>rmax[:total]
+        rmax[:total][melhor]=C[:total, total-1][melhor]
+        rarg[:total][melhor]=total-1
+    return pares, A[:, :total].astype(np.uint8)
+
+def construir_netlist(n, lista, cse=True):
+    nl=Netlist()
+    colunas=[nl.var(i) for i in range(n)]
+
+    #as 3n paridades formam uma matriz (linha 3i+0/1/2 = a/b/c da linha i)
+    M=np.array([v for (o, a, b, c) in lista for v in (a, b, c)], dtype=np.uint8)
+    if cse:
+        pares, M=cse_paridades(M)
+        for (i, j) in pares:
+            colunas.append(nl.xor(colunas[i], colunas[j]))
+
+    def paridade(linha):
+        res=nl.const(0)
+        for j in np.flatnonzero(M[linha]):
+            res=nl.xor(res, colunas[j])
+        return res
+
+    falhas=[]
+    saidas=[]
+    for i in range(n):
+        o=lista[i][0]
+        p_a, p_b, p_c=paridade(3*i), paridade(3*i+1), paridade(3*i+2)
+        #as tres 'and' partilham a mesma base b.x & c.x (CSE); so a bandeira muda
+        base=nl.and_(p_b, p_c)
+        ws=[]
+        for j in (1, 2, 3):
+            falhas.append(f'and{j}_{i}')
+            ws.append(nl.falha(base, f'and{j}_{i}', f'and{j}_w_{i}'))
+        m=nl.maj(*ws, nome=f'maj_w_{i}')
+        xor_a=nl.xor(nl.const(o), p_a, nome=f'xor_A_{i}')
+        saidas.append(nl.xor(xor_a, m, nome=f'xor_B_{i}'))
+    return nl, falhas, saidas
+
+def pedidas_build_smt_model(n, lista):
+    #gates que build_smt_model gera: por paridade n 'and' + (n-1) 'xor'; 3 'and' com falha;
+    #a maj (3 'and' + 2 'or') e 2 'xor'
+    return n*(3*(2*n-1)+3+5+2)
+
+def emitir_netlist(nl, solver, n, falhas, saidas):
+    x_bits=[BitVec(f'x_{i}', 1) for i in range(n)]
+    bandeiras={nome: Bool(nome) for nome in falhas}
+    vivos=nl.vivos(saidas)
+    expr={}
+    for a in sorted(vivos):
+        op, args, nome=nl.nos[a]
+        if op=='const':
+            expr[a]=BitVecVal(args[0], 1)
+            continue
+        if op=='x':
+            expr[a]=x_bits[args[0]]
+            continue
+        if op=='falha':
+            base, _=args
+            w=BitVec(nome, 1)
+            solver.add(Or(*[bandeiras[f] for f in sorted(nl.cones[a])], w==expr[base]))
+            expr[a]=w
+            continue
+        es=[expr[b] for b in args]
+        if op=='xor':
+            ww=es[0]^es[1]
+        elif op=='and':
+            ww=es[0]&es[1]
+        elif op=='or':
+            ww=es[0]|es[1]
+        else:
+            ww=(es[0]&es[1]) | (es[0]&es[2]) | (es[1]&es[2])
+        if not nl.cones[a]:
+            expr[a]=ww
+        else:
+            w=BitVec(nome if nome else f'g_{a}', 1)
+            solver.add(Or(*[bandeiras[f] for f in sorted(nl.cones[a])], w==ww))
+            expr[a]=w
+    saidas_wd=[(expr[a], Or(*[bandeiras[f] for f in sorted(nl.cones[a])]) if nl.cones[a] else BoolVal(False)) for a in saidas]
+    return x_bits, [bandeiras[f] for f in falhas], saidas_wd, vivos
+
+def build_netlist_model(solver, n, lista, verboso=True, cse=True):
+    nl, falhas, saidas=construir_netlist(n, lista, cse)
+    x_bits, falhas_z3, saidas_wd, vivos=emitir_netlist(nl, solver, n, falhas, saidas)
+    x_input=Concat(list(reversed(x_bits)))
+    if verboso:
+        print(f"\nModelo SMT construído a partir da netlist ({type(solver)}).")
+        print(f"  - gates em build_smt_model      : {pedidas_build_smt_model(n, lista)}")
+        print(f"  - após folding/hash-consing/CSE : {nl.contar_gates(range(len(nl.nos)))}")
+        print(f"  - vivas (emitidas para o z3)    : {nl.contar_gates(vivos)}")
+    return x_bits, falhas_z3, saidas_wd, x_input
+
+
+#--- Construcao em streaming (pouca memoria do lado Python) ---
+#cada linha e afirmada logo que e construida e as referencias intermedias morrem com ela.
+#das falhas e das saidas guardam-se so vistas indexadas que recriam o handle a partir do
+#nome (o z3 devolve o mesmo termo para o mesmo nome), em vez de 3n + n wrappers vivos
+
+class BandeirasFalha:
+    def __init__(self, n):
+        self.n=n
+
+    def __len__(self):
+        return 3*self.n
+
+    def __getitem__(self, idx):
+        if not 0<=idx<3*self.n:
+            raise IndexError(idx)
+        i, j=divmod(idx, 3)
+        return Bool(f'and{j+1}_{i}')
+
+    def __iter__(self):
+        return (self[idx] for idx in range(3*self.n))
+
+class SaidasLinhas:
+    def __init__(self, n):
+        self.n=n
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        if not 0<=i<self.n:
+            raise IndexError(i)
+        return (BitVec(f'xor_B_{i}', 1), Or(Bool(f'and1_{i}'), Bool(f'and2_{i}'), Bool(f'and3_{i}')))
+
+    def __iter__(self):
+        return (self[i] for i in range(self.n))
+
+def paridade_stream(coefs, x_bits):
+    #so os x_i com coeficiente 1, sem os n termos 'bit & x_i' de gate_prod
+    res=None
+    for j in np.flatnonzero(coefs):
+        res=x_bits[j] if res is None else res^x_bits[j]
+    return BitVecVal(0, 1) if res is None else res
+
+def build_stream_model(solver, n, lista, verboso=True):
+    x_bits=[BitVec(f'x_{i}', 1) for i in range(n)]
+    x_input=Concat(list(reversed(x_bits)))
+
+    for i in range(n):
+        o, a, b, c=lista[i]
+        f1, f2, f3=Bool(f'and1_{i}'), Bool(f'and2_{i}'), Bool(f'and3_{i}')
+        bc=paridade_stream(b, x_bits) & paridade_stream(c, x_bits)
+        w1, w2, w3=BitVec(f'and1_w_{i}', 1), BitVec(f'and2_w_{i}', 1), BitVec(f'and3_w_{i}', 1)
+        m=BitVec(f'maj_w_{i}', 1)
+        w_a=BitVec(f'xor_A_{i}', 1)
+        w_b=BitVec(f'xor_B_{i}', 1)
+        d=Or(f1, f2, f3)
+        solver.add(Or(f1, w1==bc), Or(f2, w2==bc), Or(f3, w3==bc),
+                   Or(d, m==((w1&w2) | (w1&w3) | (w2&w3))),
+                   w_a==(BitVecVal(o, 1)^paridade_stream(a, x_bits)),
+                   Or(d, w_b==(w_a^m)))
+
+    if verboso:
+        print(f"\nModelo SMT construído em streaming com {type(solver)}.")
+        print(f"  - {n} variáveis 'x_bits' mantidas; falhas e saídas acessíveis pelo nome.")
+    return x_bits, BandeirasFalha(n), SaidasLinhas(n), x_input
+
+
+#--- Taticas do z3 e portfolio paralelo ---
+#o problema e puramente 1-bit bit-vector + Bool, por isso pode ir direto para bit-blast + SAT
+
+TATICAS={
+    "default": lambda: Solver(),
+    "qfbv": lambda: SolverFor("QF_BV"),
+    "bitblast": lambda: Then("simplify", "solve-eqs", "bit-blast", "sat").solver(),
+    "bitblast-elim": lambda: Then(With("simplify", elim_and=True), "propagate-values", "solve-eqs",
+                                  "elim-uncnstr", "bit-blast", With("simplify", elim_and=True), "sat").solver(),
+}
+
+def criar_solver(tatica="default", semente=None, timeout=None):
+    if tatica not in TATICAS:
+        raise ValueError(f"Tática desconhecida: {tatica}")
+    if semente is not None:
+        #as sementes sao parametros globais; no portfolio cada configuracao corre no seu processo
+        set_param("smt.random_seed", semente)
+        set_param("sat.random_seed", semente)
+    solver=TATICAS[tatica]()
+    if timeout is not None:
+        solver.set("timeout", int(timeout*1000))
+    return solver
+
+def portfolio_trabalhador(fila, idx, n, lista, z, backend, tatica, semente, timeout):
+    inicio=time.perf_counter()
+    solver=criar_solver(tatica, semente, timeout)
+    x_bits, _=construir_ponto2(solver, n, lista, z, backend, verboso=False)
+    res=solver.check()
+    z_falso=ler_x(solver.model(), x_bits).tolist() if res==sat else None
+    fila.put((idx, str(res), z_falso, time.perf_counter()-inicio))
+
+def portfolio_ponto2(n, lista, z, configuracoes, backend="z3", timeout=None):
+    #corre cada (tatica, semente) num processo e fica com a primeira resposta definitiva (sat/unsat);
+    #devolve (resultado, z', configuracao vencedora, tempo) ou (unknown, None, None, tempo)
+    import multiprocessing
+    import queue
+    ctx=multiprocessing.get_context("spawn")
+    fila=ctx.Queue()
+    processos=[ctx.Process(target=portfolio_trabalhador,
+                           args=(fila, idx, n, lista, z, backend, tatica, semente, timeout), daemon=True)
+               for idx, (tatica, semente) in enumerate(configuracoes)]
+    inicio=time.perf_counter()
+    for p in processos:
+        p.start()
+    resposta=(unknown, None, None, None)
+    try:
+        pendentes=len(processos)
+        while pendentes:
+            try:
+                idx, res, z_falso, _=fila.get(timeout=1)
+            except queue.Empty:
+                if not any(p.is_alive() for p in processos) and fila.empty():
+                    break
+                continue
+            pendentes-=1
+            if res in ("sat", "unsat"):
+                resultado=sat if res=="sat" else unsat
+                z_falso=None if z_falso is None else np.array(z_falso, dtype=np.uint8)
+                resposta=(resultado, z_falso, configuracoes[idx], None)
+                break
+    finally:
+        for p in processos:
+            if p.is_alive():
+                p.terminate()
+        for p in processos:
+            p.join()
+    return resposta[:3]+(time.perf_counter()-inicio,)
+
+def configuracoes_portfolio(taticas, sementes):
+    return [(t, s) for t in taticas for s in sementes]
+
+
+#codificacoes do circuito disponiveis; todas tem a assinatura de build_smt_model
+BACKENDS={
+    "z3": build_smt_model,
+    "netlist": build_netlist_model,
+    "stream": build_stream_model,
+}
+
+
+def gerar_parametros(n, k, semente=SEMENTE_OMISSAO):
+    rng=np.random.default_rng(semente)
+    z=rng.integers(low=0, high=2, size=n, dtype=np.uint8)
+    s=rng.integers(low=0, high=2, size=k, dtype=np.uint8)
 
-def main():
     semente_s=np.random.SeedSequence(s.tolist())
     rng_s=np.random.default_rng(semente_s)
     sub_seeds=rng_s.integers(low=0, high=2**64, size=n, dtype=np.uint64)
@@ -150,30 +1144,59 @@ def main():
 
         lista.append((int(o), a, b, c))
 
-    print("-------------------------------------------------")
-    print(f"Geração de parâmetros concluída.")
-    print(f"Total de conjuntos de parâmetros gerados: {len(lista)}")
+    return z, s, lista
 
 
-    print("\n--- Ponto 2: Encontrar um 'falso segredo' z' ---")
-    
-    solver_p2 = Solver()
-    x_bits_p2, falhas_p2, saidas_p2, x_input_p2=build_smt_model(solver_p2, n, lista)
+def alguma_falha(solver, falhas, bloco=96):
+    #Or de todas as bandeiras sem as ter todas vivas ao mesmo tempo (com o backend stream sao
+    #recriadas pelo nome): cada bloco fica sob uma Bool auxiliar e exige-se uma das auxiliares
+    auxiliares=[]
+    atual=[]
+    for f in falhas:
+        atual.append(f)
+        if len(atual)==bloco:
+            auxiliares.append(Bool(f'alguma_falha_{len(auxiliares)}'))
+            solver.add(Implies(auxiliares[-1], Or(atual)))
+            atual=[]
+    if atual:
+        auxiliares.append(Bool(f'alguma_falha_{len(auxiliares)}'))
+        solver.add(Implies(auxiliares[-1], Or(atual)))
+    solver.add(Or(auxiliares))
+
+def construir_ponto2(solver, n, lista, z, backend="z3", verboso=True):
+    circuito=BACKENDS[backend](solver, n, lista, verboso=verboso)
+    return restricoes_ponto2(solver, n, z, circuito, verboso)
+
+def restricoes_ponto2(solver, n, z, circuito, verboso=True):
+    #circuito: o que os BACKENDS devolvem; separado para o benchmark medir as duas fases
+    x_bits_p2, falhas_p2, saidas_p2, x_input_p2=circuito
 
-    print("A adicionar restrição: Saída (w) == 0.")
+    if verboso:
+        print("A adicionar restrição: Saída (w) == 0.")
     for (w, d) in saidas_p2:
-        solver_p2.add(w==BitVecVal(0,1))
+        solver.add(w==BitVecVal(0,1))
 
-    print("A adicionar restrição: Pelo menos uma falha.")
-    solver_p2.add(Or(falhas_p2)) 
+    if verboso:
+        print("A adicionar restrição: Pelo menos uma falha.")
+    alguma_falha(solver, falhas_p2)
+
+    if z is None:
+        #sem segredo a excluir (contagem de todos os z' compativeis)
+        return x_bits_p2, falhas_p2
 
     z_int = 0
     for i in range(n):
         z_int += int(z[i]) * (2**i)
     z_original_z3 = BitVecVal(z_int, n)
     
-    print("A adicionar restrição: Input z' != z.")
-    solver_p2.add(x_input_p2 != z_original_z3)
+    if verboso:
+        print("A adicionar restrição: Input z' != z.")
+    solver.add(x_input_p2 != z_original_z3)
+    return x_bits_p2, falhas_p2
+
+def ponto2(n, lista, z, backend="z3", tatica="default"):
+    solver_p2 = criar_solver(tatica)
+    x_bits_p2, falhas_p2=construir_ponto2(solver_p2, n, lista, z, backend)
 
     print("A verificar o solver (solver_p2.check())...")
     check_p2 = solver_p2.check()
@@ -208,20 +1231,64 @@ def main():
     else:
         print(f"\n O Solver retornou: {check_p2}")
 
+def ponto2_portfolio(n, lista, z, configuracoes, backend="z3", timeout=None):
+    print(f"A correr um portfolio de {len(configuracoes)} configurações em paralelo...")
+    res, z_prime, vencedora, t=portfolio_ponto2(n, lista, z, configuracoes, backend, timeout)
+    if res==sat:
+        print(f"\n -> SATISFAZIVEL: primeira resposta de {vencedora[0]} (semente {vencedora[1]}) em {t:.3f}s.")
+        print(f"  - Estimativa (z')     : {z_prime}")
+    elif res==unsat:
+        print(f"\n -> INSATISFAZIVEL: primeira resposta de {vencedora[0]} (semente {vencedora[1]}) em {t:.3f}s.")
+    else:
+        print(f"\n O portfolio não obteve resposta definitiva ({t:.3f}s).")
+
+def ponto2_cnf(n, lista, z, comando, xor_clausulas=False):
+    print(f"A resolver a CNF do Ponto 2 com {comando}...")
+    cnf=cnf_ponto2(n, lista, z, xor_clausulas)
+    print(f"  - {cnf.num_vars} variáveis, {len(cnf.clausulas)} cláusulas, {len(cnf.xclausulas)} cláusulas XOR.")
+    estado, atribuicao=resolver_cnf(cnf, None if comando==SAT_INTERNO else comando)
+    if estado==sat:
+        z_prime, falhas=interpretar_solucao_cnf(cnf, atribuicao, n)
+        print("\n -> SATISFAZIVEL (CNF): Encontrada uma solução!")
+        print(f"  - Estimativa (z')     : {z_prime}")
+        print(f"  - Total de falhas 'and' ocorridas: {len(falhas)}")
+    else:
+        print(f"\n O solver SAT retornou: {estado}")
+
+def ponto2_enumerar(n, lista, z, limite, tempo):
+    print(f"\n--- Ponto 2 (enumeração): até {limite} falsos segredos z' ---")
+    gerador=enumerar_z_falsos(n, lista, z_excluir=z, limite=limite, tempo=tempo)
+    total_z=0
+    for z_falso in gerador:
+        total_z+=1
+        print(f"  z'_{total_z}: {''.join(str(v) for v in z_falso)}")
+    print(f"  - Total de z' enumerados: {total_z}")
+
+def ponto3(n, lista, z, motor=MOTOR_P3, timeout=TIMEOUT_P3, backend="z3"):
+    if motor=="auto" and x_esta_fixo(z, n):
+        ponto3_decomposto(lista, z)
+    elif motor=="optimize":
+        ponto3_optimize(n, lista, z, backend)
+    else:
+        ponto3_maxsat(n, lista, z, "oll" if motor=="auto" else motor, timeout, backend)
 
-    print("\n--- Ponto 3: Maximizar falhas com 'z' conhecido ---")
-    
-    opt = Optimize()
-    
-    x_bits_p3, falhas_p3, saidas_p3, _ = build_smt_model(opt, n, lista)
 
-    print("A adicionar restrição: Input 'x' deve ser o segredo 'z'.")
+def restricoes_ponto3(solver, n, z, x_bits, saidas, verboso=True):
+    if verboso:
+        print("A adicionar restrição: Input 'x' deve ser o segredo 'z'.")
     for i in range(n):
-        opt.add(x_bits_p3[i] == int(z[i]))
+        solver.add(x_bits[i] == int(z[i]))
 
-    print("A adicionar restrição: Saída (w) deve ser 0.")
-    for (w, d) in saidas_p3:
-        opt.add(w==BitVecVal(0,1))
+    if verboso:
+        print("A adicionar restrição: Saída (w) deve ser 0.")
+    for (w, d) in saidas:
+        solver.add(w==BitVecVal(0,1))
+
+def ponto3_optimize(n, lista, z, backend="z3"):
+    opt = Optimize()
+    
+    x_bits_p3, falhas_p3, saidas_p3, _ = BACKENDS[backend](opt, n, lista)
+    restricoes_ponto3(opt, n, z, x_bits_p3, saidas_p3)
 
     num_falhas = Sum([If(f, 1, 0) for f in falhas_p3])
     
@@ -253,6 +1320,290 @@ def main():
     else:
         print(f"\n O Otimizador retornou: {check_p3}")
 
+def ponto3_decomposto(lista, x_fixo):
+    print("x fixo: o problema decompõe-se em linhas independentes (3 bandeiras cada).")
+    max_falhas, escolhas = maximizar_falhas_decomposto(lista, x_fixo)
+
+    if max_falhas is None:
+        print(f"\n -> INSATISFAZIVEL: A linha {escolhas} não admite saída 0.")
+        return
+
+    print("\n -> SATISFAZIVEL: Encontrada uma solução ótima (soma dos ótimos por linha)!")
+    print(f"  - Input 'x'           : {x_fixo} (o segredo original, como forçado)")
+    print(f"  - Saída do circuito   : 0^n (como forçado)")
+    print(f"  - NÚMERO MÁXIMO DE FALHAS: {max_falhas}")
+    print(f"  - Total de {max_falhas} falhas ativadas (de {3*len(lista)} possíveis).")
+
+def ponto3_maxsat(n, lista, z, estrategia, timeout, backend="z3"):
+    solver = Solver()
+
+    x_bits_p3, falhas_p3, saidas_p3, _ = BACKENDS[backend](solver, n, lista)
+    restricoes_ponto3(solver, n, z, x_bits_p3, saidas_p3)
+
+    print(f"A maximizar as falhas 'and' com MaxSAT ({estrategia}, timeout={timeout}s)...")
+    lb, ub, m_p3 = maxsat_falhas(solver, falhas_p3, estrategia, timeout)
+
+    if ub == -1:
+        print("\n -> INSATISFAZIVEL: Não há solução.")
+    elif lb == ub:
+        print("\n -> SATISFAZIVEL: Encontrada uma solução ótima!")
+        print(f"  - Input 'x'           : {z} (o segredo original, como forçado)")
+        print(f"  - Saída do circuito   : 0^n (como forçado)")
+        print(f"  - NÚMERO MÁXIMO DE FALHAS: {lb}")
+    else:
+        print("\n -> TIMEOUT: ótimo não provado, apenas limites.")
+        print(f"  - Limite inferior (melhor solução): {lb}")
+        print(f"  - Limite superior                 : {ub}")
+
+    if m_p3 is not None:
+        print(f"  - Total de {contar_verdadeiras(m_p3, falhas_p3)} falhas ativadas (de {len(falhas_p3)} possíveis).")
+
+
+#--- Benchmark de escalabilidade ---
+#cada fase mede o tempo e o pico de memoria do lado Python (tracemalloc); depois de cada
+#check regista-se tambem a memoria reportada pelo z3
+
+def rss_pico_mb():
+    #pico de RSS do processo (ru_maxrss vem em KB no Linux); e monotono, por isso so e
+    #representativo de cada ponto com --isolar
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024, 1)
+
+def medir(fase, linha, funcao):
+    #mem_<fase>_mb e o pico acima do que ja estava alocado antes da fase
+    base=0
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        base=tracemalloc.get_traced_memory()[0]
+    inicio=time.perf_counter()
+    res=funcao()
+    linha[f"t_{fase}"]=round(time.perf_counter()-inicio, 4)
+    if tracemalloc.is_tracing():
+        linha[f"mem_{fase}_mb"]=round((tracemalloc.get_traced_memory()[1]-base)/2**20, 2)
+    linha[f"rss_{fase}_mb"]=rss_pico_mb()
+    return res
+
+def memoria_z3(solver):
+    est=solver.statistics()
+    return est.get_key_value("memory") if "memory" in est.keys() else None
+
+def benchmark_ponto(n, k, semente, backend, motor_p3, timeout, sat_solver=None, xor_clausulas=False, tatica="default"):
+    linha={"n": n, "k": k, "semente": semente, "backend": backend, "tatica": tatica}
+
+    z, _, lista=medir("geracao", linha, lambda: gerar_parametros(n, k, semente))
+
+    solver_p2=criar_solver(tatica, timeout=timeout)
+    circuito=medir("circuito_p2", linha, lambda: BACKENDS[backend](solver_p2, n, lista, verboso=False))
+    medir("build_p2", linha, lambda: restricoes_ponto2(solver_p2, n, z, circuito, verboso=False))
+    del circuito
+    linha["res_p2"]=str(medir("solve_p2", linha, solver_p2.check))
+    linha["z3_mem_p2_mb"]=memoria_z3(solver_p2)
+    del solver_p2
+
+    if sat_solver is not None:
+        #a mesma instancia do Ponto 2 em CNF, para comparar com solvers SAT dedicados
+        cnf=medir("build_cnf", linha, lambda: cnf_ponto2(n, lista, z, xor_clausulas))
+        comando=None if sat_solver==SAT_INTERNO else sat_solver
+        estado, _=medir("solve_cnf", linha, lambda: resolver_cnf(cnf, comando, timeout))
+        linha["res_cnf"]=str(estado)
+        del cnf
+
+    if motor_p3=="auto" and x_esta_fixo(z, n):
+        linha["t_build_p3"]=0.0
+        if tracemalloc.is_tracing():
+            linha["mem_build_p3_mb"]=0.0
+        total, _=medir("solve_p3", linha, lambda: maximizar_falhas_decomposto(lista, z))
+        linha["res_p3"]=total
+        linha["z3_mem_p3_mb"]=None
+    else:
+        #com "optimize" mede-se o Optimize do z3, como em ponto3_optimize
+        solver_p3=Optimize() if motor_p3=="optimize" else Solver()
+        def construir_p3():
+            x_bits, falhas, saidas, _=BACKENDS[backend](solver_p3, n, lista, verboso=False)
+            restricoes_ponto3(solver_p3, n, z, x_bits, saidas, verboso=False)
+            return falhas
+        falhas=medir("build_p3", linha, construir_p3)
+        if motor_p3=="optimize":
+            if timeout is not None:
+                solver_p3.set("timeout", int(timeout*1000))
+            objetivo=solver_p3.maximize(Sum([If(f, 1, 0) for f in falhas]))
+            res=medir("solve_p3", linha, solver_p3.check)
+            if res==sat:
+                linha["res_p3"]=objetivo.value().as_long()
+            else:
+                linha["res_p3"]=str(res)
+        else:
+            estrategia="oll" if motor_p3=="auto" else motor_p3
+            lb, ub, _=medir("solve_p3", linha, lambda: maxsat_falhas(solver_p3, falhas, estrategia, timeout, progresso=lambda *a: None))
+            linha["res_p3"]=lb if lb==ub else f"[{lb},{ub}]"
+        linha["z3_mem_p3_mb"]=memoria_z3(solver_p3)
+    return linha
+
+def benchmark_ponto_isolado(args):
+    #ponto do benchmark num processo proprio (ver --isolar); args e um tuplo para poder ser enviado
+    memoria_python=args[-1]
+    if memoria_python:
+        tracemalloc.start()
+    try:
+        linha=benchmark_ponto(*args[:-1])
+    finally:
+        if memoria_python:
+            tracemalloc.stop()
+    linha["rss_pico_mb"]=rss_pico_mb()
+    return linha
+
+def benchmark(ns, k, semente, backends, motor_p3=MOTOR_P3, timeout=None, ao_terminar=None, sat_solver=None,
+              xor_clausulas=False, memoria_python=True, isolar=False, taticas=("default",)):
+    pontos=[(n, k, semente, backend, motor_p3, timeout, sat_solver, xor_clausulas, tatica, memoria_python)
+            for n in ns for backend in backends for tatica in taticas]
+    linhas=[]
+    if isolar:
+        import multiprocessing
+        with multiprocessing.get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+            resultados=pool.imap(benchmark_ponto_isolado, pontos)
+            for linha in resultados:
+                linhas.append(linha)
+                if ao_terminar is not None:
+                    ao_terminar(linha)
+        return linhas
+    for ponto in pontos:
+        linha=benchmark_ponto_isolado(ponto)
+        linhas.append(linha)
+        if ao_terminar is not None:
+            ao_terminar(linha)
+    return linhas
+
+COLUNAS_TABELA=["n", "backend", "tatica", "t_geracao", "t_circuito_p2", "mem_circuito_p2_mb", "t_build_p2",
+                "t_solve_p2", "mem_build_p2_mb", "z3_mem_p2_mb",
+                "res_p2", "t_build_p3", "t_solve_p3", "mem_build_p3_mb", "res_p3", "rss_pico_mb"]
+
+COLUNAS_CNF=["t_build_cnf", "t_solve_cnf", "res_cnf"]
+
+def imprimir_cabecalho(colunas=COLUNAS_TABELA):
+    print(" ".join(f"{c:>15}" for c in colunas))
+
+def imprimir_linha(linha, colunas=COLUNAS_TABELA):
+    print(" ".join(f"{str(linha.get(c)):>15}" for c in colunas))
+
+
+def percentil(valores, p):
+    return round(float(np.percentile(valores, p)), 4) if valores else None
+
+def medir_latencias(n, k, sementes, taticas, backend="z3", timeout=None, portfolio=None):
+    #latencia do check do Ponto 2 sobre varias instancias (uma por semente), para cada tatica e,
+    #se for dada uma lista de configuracoes, para o portfolio; devolve mediana e p90 por linha
+    tempos={t: [] for t in taticas}
+    if portfolio:
+        tempos["portfolio"]=[]
+    for semente in sementes:
+        z, _, lista=gerar_parametros(n, k, semente)
+        for tatica in taticas:
+            solver=criar_solver(tatica, timeout=timeout)
+            construir_ponto2(solver, n, lista, z, backend, verboso=False)
+            inicio=time.perf_counter()
+            solver.check()
+            tempos[tatica].append(time.perf_counter()-inicio)
+        if portfolio:
+            #inclui o arranque dos processos e a construcao em cada um
+            tempos["portfolio"].append(portfolio_ponto2(n, lista, z, portfolio, backend, timeout)[3])
+    return [{"n": n, "configuracao": c, "instancias": len(v), "mediana_s": percentil(v, 50), "p90_s": percentil(v, 90)}
+            for c, v in tempos.items()]
+
+def ler_argumentos(argv=None):
+    parser=argparse.ArgumentParser(description="TP2 Ex1: falsos segredos e maximização de falhas no circuito com 'and' redundantes.")
+    parser.add_argument("-n", type=int, default=N_OMISSAO, help="tamanho do segredo z")
+    parser.add_argument("-k", type=int, default=K_OMISSAO, help="tamanho da semente s")
+    parser.add_argument("--semente", type=int, default=SEMENTE_OMISSAO, help="semente do gerador de z e s")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="z3", help="codificação do circuito")
+    parser.add_argument("--motor-p3", default=MOTOR_P3, choices=["auto", "optimize"]+sorted(ESTRATEGIAS_MAXSAT))
+    parser.add_argument("--timeout-p3", type=float, default=TIMEOUT_P3)
+    parser.add_argument("--enum-p2", type=int, default=ENUM_LIMITE_P2, help="enumerar até este número de z' (0 desliga)")
+    parser.add_argument("--timeout-p2", type=float, default=TIMEOUT_P2)
+    parser.add_argument("--sweep", help="benchmark: lista de n separada por vírgulas (p.ex. 32,64,128,256,512,1024)")
+    parser.add_argument("--backends", help="benchmark: backends a comparar, separados por vírgulas (omissão: --backend)")
+    parser.add_argument("--timeout", type=float, default=None, help="benchmark: timeout por check (segundos)")
+    parser.add_argument("--json", action="store_true", help="benchmark: resultados em JSON em vez de tabela")
+    parser.add_argument("--isolar", action="store_true", help="benchmark: cada ponto num processo novo (pico de RSS por ponto)")
+    parser.add_argument("--sem-tracemalloc", action="store_true", help="benchmark: não medir a memória Python (tempos sem o custo do tracemalloc)")
+    parser.add_argument("--tatica", choices=sorted(TATICAS), default="default", help="tática do z3 para o Ponto 2")
+    parser.add_argument("--portfolio", help="Ponto 2 com portfolio: táticas separadas por vírgulas (p.ex. default,bitblast,qfbv)")
+    parser.add_argument("--sementes", default="0", help="portfolio/latência: sementes aleatórias do z3 separadas por vírgulas")
+    parser.add_argument("--latencia", type=int, default=0, help="medir mediana e p90 do Ponto 2 sobre este número de instâncias")
+    parser.add_argument("--dimacs", help="escrever a CNF (Tseitin) do Ponto 2 neste ficheiro DIMACS")
+    parser.add_argument("--xor", action="store_true", help="CNF com cláusulas XOR no formato CryptoMiniSat")
+    parser.add_argument("--sat-solver", help=f"resolver o Ponto 2 em CNF com este comando SAT ('{SAT_INTERNO}' usa o z3)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args=ler_argumentos(argv)
+
+    sementes_z3=[int(v) for v in args.sementes.split(",")]
+    portfolio=configuracoes_portfolio(args.portfolio.split(","), sementes_z3) if args.portfolio else None
+    if portfolio:
+        for t, _ in portfolio:
+            if t not in TATICAS:
+                raise SystemExit(f"Tática desconhecida: {t}")
+
+    if args.latencia:
+        taticas=args.portfolio.split(",") if args.portfolio else [args.tatica]
+        sementes=range(args.semente, args.semente+args.latencia)
+        linhas=medir_latencias(args.n, args.k, sementes, taticas, args.backend, args.timeout, portfolio)
+        if args.json:
+            print(json.dumps(linhas, indent=2))
+        else:
+            colunas=["n", "configuracao", "instancias", "mediana_s", "p90_s"]
+            imprimir_cabecalho(colunas)
+            for linha in linhas:
+                imprimir_linha(linha, colunas)
+        return
+
+    if args.sweep:
+        ns=[int(v) for v in args.sweep.split(",")]
+        backends=args.backends.split(",") if args.backends else [args.backend]
+        for b in backends:
+            if b not in BACKENDS:
+                raise SystemExit(f"Backend desconhecido: {b}")
+        colunas=COLUNAS_TABELA+(COLUNAS_CNF if args.sat_solver else [])
+        if args.json:
+            linhas=benchmark(ns, args.k, args.semente, backends, args.motor_p3, args.timeout,
+                             sat_solver=args.sat_solver, xor_clausulas=args.xor,
+                             memoria_python=not args.sem_tracemalloc, isolar=args.isolar, taticas=[args.tatica])
+            print(json.dumps(linhas, indent=2))
+        else:
+            imprimir_cabecalho(colunas)
+            benchmark(ns, args.k, args.semente, backends, args.motor_p3, args.timeout,
+                      ao_terminar=lambda linha: imprimir_linha(linha, colunas),
+                      sat_solver=args.sat_solver, xor_clausulas=args.xor,
+                      memoria_python=not args.sem_tracemalloc, isolar=args.isolar, taticas=[args.tatica])
+        return
+
+    n=args.n
+    z, _, lista=gerar_parametros(n, args.k, args.semente)
+
+    print("-------------------------------------------------")
+    print(f"Geração de parâmetros concluída.")
+    print(f"Total de conjuntos de parâmetros gerados: {len(lista)}")
+
+
+    print("\n--- Ponto 2: Encontrar um 'falso segredo' z' ---")
+    if portfolio:
+        ponto2_portfolio(n, lista, z, portfolio, args.backend, args.timeout)
+    else:
+        ponto2(n, lista, z, args.backend, args.tatica)
+
+    if args.dimacs:
+        cnf_ponto2(n, lista, z, args.xor).escrever(args.dimacs)
+        print(f"CNF do Ponto 2 escrita em {args.dimacs}.")
+
+    if args.sat_solver:
+        ponto2_cnf(n, lista, z, args.sat_solver, args.xor)
+
+    if args.enum_p2:
+        ponto2_enumerar(n, lista, z, args.enum_p2, args.timeout_p2)
+
+
+    print("\n--- Ponto 3: Maximizar falhas com 'z' conhecido ---")
+    ponto3(n, lista, z, args.motor_p3, args.timeout_p3, args.backend)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,719 @@
+import argparse
+import time
+
+import z3
+
+SKIP = 1
+LEFT = 2
+RIGHT = 3
+STOP = 4
+ERROR = 5
+
+
+def init_state(s, a, b):
+
+    loc, x, y, z = s
+    n_bits = x.size()
+    
+    return z3.And(
+        loc == SKIP,
+        x == a,
+        y == b,
+        z == z3.BitVecVal(0, n_bits),
+        z3.UGE(a, z3.BitVecVal(0, n_bits)),
+        z3.UGE(b, z3.BitVecVal(0, n_bits))
+    )
+
+
+def error_state(s):
+    loc, _, _, _ = s
+    return loc == ERROR
+
+
+def overflows(x, z, n_bits, codificacao="original"):
+    # (overflow_left, overflow_right) de x << 1 e de z + x, sem sinal
+    #   original:  máscara do MSB e ULT(z + x, z)
+    #   nativo:    predicados BVMulNoOverflow/BVAddNoOverflow do z3
+    #   estendido: a operação feita com 1 bit extra; o overflow é esse bit
+    if codificacao == "original":
+        msb_mask = z3.BitVecVal(1, n_bits) << (n_bits - 1)
+        return (x & msb_mask) != 0, z3.ULT(z + x, z)
+    if codificacao == "nativo":
+        dois = z3.BitVecVal(2, n_bits)
+        return (z3.Not(z3.BVMulNoOverflow(x, dois, False)),
+                z3.Not(z3.BVAddNoOverflow(z, x, False)))
+    if codificacao == "estendido":
+        x_ext = z3.ZeroExt(1, x)
+        return (z3.Extract(n_bits, n_bits, x_ext << 1) == 1,
+                z3.Extract(n_bits, n_bits, z3.ZeroExt(1, z) + x_ext) == 1)
+    raise ValueError(f"codificação de overflow desconhecida: {codificacao}")
+
+
+CODIFICACOES_OVERFLOW = ("original", "nativo", "estendido")
+
+
+def transition_relation(s, s_p, a, b, n_bits, overflow="original"):
+    loc, x, y, z = s
+    loc_p, x_p, y_p, z_p = s_p
+
+    overflow_left, overflow_right = overflows(x, z, n_bits, overflow)
+
+    trans_skip_stop = z3.And(
+        loc == SKIP, y == 0,
+        loc_p == STOP, x_p == x, y_p == y, z_p == z
+    )
+    
+    trans_skip_left = z3.And(
+        loc == SKIP, y != 0, (y & 1) == 0,
+        loc_p == LEFT, x_p == x, y_p == y, z_p == z
+    )
+    
+    trans_skip_right = z3.And(
+        loc == SKIP, y != 0, (y & 1) != 0,
+        loc_p == RIGHT, x_p == x, y_p == y, z_p == z
+    )
+
+    trans_left_skip = z3.And(
+        loc == LEFT, z3.Not(overflow_left),
+        loc_p == SKIP, x_p == (x << 1), y_p == z3.LShR(y, 1), z_p == z
+    )
+    
+    trans_left_error = z3.And(
+        loc == LEFT, overflow_left,
+        loc_p == ERROR, x_p == (x << 1), y_p == z3.LShR(y, 1), z_p == z
+    )
+
+    trans_right_skip = z3.And(
+        loc == RIGHT, z3.Not(overflow_right),
+        loc_p == SKIP, x_p == x, y_p == (y - 1), z_p == (z + x)
+    )
+    
+    trans_right_error = z3.And(
+        loc == RIGHT, overflow_right,
+        loc_p == ERROR, x_p == x, y_p == (y - 1), z_p == (z + x)
+    )
+
+    trans_stop_stop = z3.And(
+        loc == STOP,
+        loc_p == STOP, x_p == x, y_p == y, z_p == z
+    )
+    
+    trans_error_error = z3.And(
+        loc == ERROR,
+        loc_p == ERROR, x_p == x, y_p == y, z_p == z
+    )
+
+    return z3.Or(
+        trans_skip_stop,
+        trans_skip_left,
+        trans_skip_right,
+        trans_left_skip,
+        trans_left_error,
+        trans_right_skip,
+        trans_right_error,
+        trans_stop_stop,
+        trans_error_error
+    )
+
+
+def transition_relation_acelerada(s, s_p, a, b, n_bits, j):
+    # cada macro-passo a partir de SKIP consome j bits de y de uma vez:
+    #   x' = x << j, y' = y >> j, z' = z + x * (y mod 2^j)
+    # os ciclos SKIP/LEFT/RIGHT intermédios deixam de gerar frames.
+    # Os testes de overflow são feitos sobre a soma exata (2n+1 bits): as somas
+    # parciais de z crescem monotonamente, portanto há overflow num passo intermédio
+    # sse houver na soma final; o shift de x dá overflow sse algum bit sai à esquerda.
+    loc, x, y, z = s
+    loc_p, x_p, y_p, z_p = s_p
+    j = min(j, n_bits)
+    largo = 2 * n_bits + 1
+    limite = z3.BitVecVal(2 ** n_bits, largo)
+
+    def soma_exata(mult):
+        return z3.ZeroExt(n_bits + 1, z) + z3.ZeroExt(n_bits + 1, x) * z3.ZeroExt(n_bits + 1, mult)
+
+    # bloco completo: ainda há bits de y acima dos j consumidos, logo há j shifts
+    y_baixo = y & z3.BitVecVal(2 ** j - 1, n_bits)
+    soma = soma_exata(y_baixo)
+    erro_bloco = z3.Or(z3.LShR(x, n_bits - j) != 0, z3.UGE(soma, limite))
+    bloco = z3.And(
+        loc == SKIP, z3.LShR(y, j) != 0,
+        x_p == (x << j), y_p == z3.LShR(y, j), z_p == z3.Extract(n_bits - 1, 0, soma),
+        z3.If(erro_bloco, loc_p == ERROR, loc_p == SKIP)
+    )
+
+    # último bloco: y tem h+1 bits significativos (h < j); há h shifts e o ciclo termina
+    soma_fim = soma_exata(y)
+    h = z3.BitVecVal(0, n_bits)
+    erro_shift = z3.BoolVal(False)
+    for i in range(1, j):
+        topo = z3.LShR(y, i) != 0
+        h = z3.If(topo, z3.BitVecVal(i, n_bits), h)
+        erro_shift = z3.If(topo, z3.LShR(x, n_bits - i) != 0, erro_shift)
+    erro_fim = z3.Or(erro_shift, z3.UGE(soma_fim, limite))
+    fim = z3.And(
+        loc == SKIP, y != 0, z3.LShR(y, j) == 0,
+        x_p == (x << h), y_p == 0, z_p == z3.Extract(n_bits - 1, 0, soma_fim),
+        z3.If(erro_fim, loc_p == ERROR, loc_p == STOP)
+    )
+
+    trans_skip_stop = z3.And(
+        loc == SKIP, y == 0,
+        loc_p == STOP, x_p == x, y_p == y, z_p == z
+    )
+
+    trans_stop_stop = z3.And(
+        loc == STOP,
+        loc_p == STOP, x_p == x, y_p == y, z_p == z
+    )
+
+    trans_error_error = z3.And(
+        loc == ERROR,
+        loc_p == ERROR, x_p == x, y_p == y, z_p == z
+    )
+
+    return z3.Or(
+        trans_skip_stop,
+        bloco,
+        fim,
+        trans_stop_stop,
+        trans_error_error
+    )
+
+
+def frames_completos(m_bound):
+    # passos até STOP/ERROR para qualquer b <= m_bound: cada bit de b custa SKIP->LEFT->SKIP
+    # (2) ou SKIP->RIGHT->SKIP->LEFT->SKIP (4); o último acaba em SKIP->RIGHT->SKIP->STOP (3)
+    return max(1, 4 * m_bound.bit_length() - 1)
+
+
+def frames_acelerados(n_bits, j):
+    # frames que cobrem uma multiplicação completa: ceil(n/j) macro-passos + SKIP -> STOP
+    return -(-n_bits // min(j, n_bits)) + 1
+
+
+def get_state_vec(i, n_bits):
+    # (loc, x, y, z) do frame i
+    return [
+        z3.Int(f'loc_{i}'),
+        z3.BitVec(f'x_{i}', n_bits),
+        z3.BitVec(f'y_{i}', n_bits),
+        z3.BitVec(f'z_{i}', n_bits)
+    ]
+
+
+def get_state_vecs(k, n_bits):
+    return [get_state_vec(i, n_bits) for i in range(k + 1)]
+
+
+def check_invariant(k_steps, n_bits):
+    
+    print(f"--- A verificar Invariante para {k_steps} passos ({n_bits} bits) ---")
+    
+    a = z3.BitVec('a', n_bits)
+    b = z3.BitVec('b', n_bits)
+    
+    states = get_state_vecs(k_steps, n_bits)
+    
+    solver = z3.Solver()
+    
+    solver.add(init_state(states[0], a, b))
+    
+    for i in range(k_steps):
+        solver.add(transition_relation(states[i], states[i+1], a, b, n_bits))
+        
+    def P(s):
+        loc, x, y, z = s
+        prop = (x * y + z) == (a * b)
+        return z3.Implies(loc != ERROR, prop)
+
+    counter_example = z3.Or([z3.Not(P(s)) for s in states])
+    solver.add(counter_example)
+    
+    result = solver.check()
+    
+    if result == z3.unsat:
+        print(f"Resultado: Invariante (x*y + z == a*b) válido até {k_steps} passos.")
+    else:
+        print(f"Resultado: Invariante VIOLADO em {k_steps} passos.")
+        print("Contra-exemplo (modelo):")
+        print(solver.model())
+    print("-" * 60)
+
+
+def check_safety(n_steps, n_bits, n_bound, m_bound, overflow="original"):
+   
+    print(f"--- A Verificar Segurança para {n_steps} passos ({n_bits} bits) ---")
+    print(f"             Restrições: {n_bound} <= a, b <= {m_bound}")
+    
+    a = z3.BitVec('a', n_bits)
+    b = z3.BitVec('b', n_bits)
+    
+    states = get_state_vecs(n_steps, n_bits)
+    
+    solver = z3.Solver()
+    
+    solver.add(init_state(states[0], a, b))
+    
+    a_val_n = z3.BitVecVal(n_bound, n_bits)
+    a_val_m = z3.BitVecVal(m_bound, n_bits)
+    b_val_n = z3.BitVecVal(n_bound, n_bits)
+    b_val_m = z3.BitVecVal(m_bound, n_bits)
+    
+    solver.add(z3.And(
+        z3.UGE(a, a_val_n), z3.ULE(a, a_val_m),
+        z3.UGE(b, b_val_n), z3.ULE(b, b_val_m)
+    ))
+
+    for i in range(n_steps):
+        solver.add(transition_relation(states[i], states[i+1], a, b, n_bits, overflow))
+
+    error_reached = z3.Or([error_state(s) for s in states])
+    solver.add(error_reached)
+    
+    result = solver.check()
+    
+    if result == z3.unsat:
+        print(f"Resultado: O estado de ERRO NÃO é alcançável em {n_steps} passos")
+        print(f"           com as restrições {n_bound} <= a, b <= {m_bound}.")
+    else:
+        print(f"Resultado: O estado de ERRO É ALCANÇÁVEL em {n_steps} passos!")
+        print("Modelo que leva ao erro:")
+        m = solver.model()
+        print(m)
+        print("\nTraço para o erro:")
+        for i in range(n_steps + 1):
+            s_i = states[i]
+            loc_val = m.eval(s_i[0])
+            x_val = m.eval(s_i[1])
+            y_val = m.eval(s_i[2])
+            z_val = m.eval(s_i[3])
+            print(f"  Passo {i}: loc={loc_val}, x={x_val}, y={y_val}, z={z_val}")
+            if loc_val.as_long() == ERROR:
+                break
+                
+    print("-" * 60)
+
+
+class BMCIncremental:
+    # BMC incremental: um único solver, um frame de cada vez e cada propriedade por assunção
+
+    def __init__(self, n_bits, j=None, overflow="original"):
+        # j: se dado, desenrola a relação acelerada (j bits de y por frame)
+        self.n_bits = n_bits
+        self.j = j
+        self.overflow = overflow
+        self.a = z3.BitVec('a', n_bits)
+        self.b = z3.BitVec('b', n_bits)
+        self.solver = z3.Solver()
+        self.states = get_state_vecs(0, n_bits)
+        self.solver.add(init_state(self.states[0], self.a, self.b))
+        self.lits_limites = {}
+        self.lits_inv = {}
+        self.lits_erro = {}
+        self.formulas = {}
+
+    def desenrolar(self, k):
+        # acrescenta as transições em falta até ao frame k (nunca as repete)
+        while len(self.states) <= k:
+            i = len(self.states)
+            s_i = get_state_vec(i, self.n_bits)
+            if self.j is None:
+                self.solver.add(transition_relation(self.states[i - 1], s_i, self.a, self.b, self.n_bits,
+                                                    self.overflow))
+            else:
+                self.solver.add(transition_relation_acelerada(self.states[i - 1], s_i, self.a, self.b,
+                                                              self.n_bits, self.j))
+            self.states.append(s_i)
+
+    def limites(self, n_bound, m_bound):
+        # literal que, assumido, restringe n_bound <= a, b <= m_bound
+        chave = (n_bound, m_bound)
+        if chave not in self.lits_limites:
+            lit = z3.Bool(f'limites_{n_bound}_{m_bound}')
+            lo = z3.BitVecVal(n_bound, self.n_bits)
+            hi = z3.BitVecVal(m_bound, self.n_bits)
+            self.solver.add(z3.Implies(lit, z3.And(
+                z3.UGE(self.a, lo), z3.ULE(self.a, hi),
+                z3.UGE(self.b, lo), z3.ULE(self.b, hi)
+            )))
+            self.lits_limites[chave] = lit
+        return self.lits_limites[chave]
+
+    def violacao_invariante(self, i):
+        if i not in self.lits_inv:
+            loc, x, y, z = self.states[i]
+            prop = (x * y + z) == (self.a * self.b)
+            self.lits_inv[i] = self.alvo(f'viol_inv_{i}', z3.Not(z3.Implies(loc != ERROR, prop)))
+        return self.lits_inv[i]
+
+    def erro(self, i):
+        if i not in self.lits_erro:
+            self.lits_erro[i] = self.alvo(f'erro_{i}', error_state(self.states[i]))
+        return self.lits_erro[i]
+
+    def alvo(self, nome, formula):
+        lit = z3.Bool(nome)
+        self.solver.add(z3.Implies(lit, formula))
+        self.formulas[lit.get_id()] = formula
+        return lit
+
+    def procurar(self, k_max, literal, extra=()):
+        # primeira profundidade i <= k_max onde o alvo é alcançável: (i, modelo); (None, None) se
+        # não o é em nenhuma; ("unknown", i) se o solver desistiu (timeout) na profundidade i
+        for i in range(k_max + 1):
+            self.desenrolar(i)
+            lit = literal(i)
+            res = self.solver.check(*extra, lit)
+            if res == z3.sat:
+                return i, self.solver.model()
+            if res != z3.unsat:
+                return "unknown", i
+            # unsat: o alvo é impossível neste frame (sob as assunções extra); fica como lema
+            # para as profundidades seguintes, que têm sempre este prefixo do desenrolamento
+            self.solver.add(z3.Not(z3.And(list(extra) + [self.formulas[lit.get_id()]])))
+        return None, None
+
+
+def check_invariant_incremental(k_steps, n_bits, bmc=None):
+
+    print(f"--- Invariante incremental até {k_steps} passos ({n_bits} bits) ---")
+    bmc = bmc or BMCIncremental(n_bits)
+    inicio = time.perf_counter()
+    prof, m = bmc.procurar(k_steps, bmc.violacao_invariante)
+
+    if prof == "unknown":
+        print(f"Resultado: INCONCLUSIVO (solver sem resposta na profundidade {m}).")
+    elif prof is None:
+        print(f"Resultado: Invariante (x*y + z == a*b) válido até {k_steps} passos.")
+    else:
+        print(f"Resultado: Invariante VIOLADO; profundidade mínima {prof}.")
+        print(f"           a={m.eval(bmc.a)}, b={m.eval(bmc.b)}")
+    print(f"Tempo: {time.perf_counter() - inicio:.3f}s")
+    print("-" * 60)
+    return prof
+
+
+def check_safety_incremental(n_steps, n_bits, limites, bmc=None):
+    # limites: lista de (n_bound, m_bound); o mesmo solver (e as cláusulas aprendidas) serve todos
+    print(f"--- Segurança incremental até {n_steps} passos ({n_bits} bits) ---")
+    bmc = bmc or BMCIncremental(n_bits)
+    resultados = {}
+
+    for (n_bound, m_bound) in limites:
+        inicio = time.perf_counter()
+        prof, m = bmc.procurar(n_steps, bmc.erro, [bmc.limites(n_bound, m_bound)])
+        resultados[(n_bound, m_bound)] = prof
+        t = time.perf_counter() - inicio
+        if prof == "unknown":
+            print(f"  {n_bound} <= a, b <= {m_bound}: INCONCLUSIVO na profundidade {m} ({t:.3f}s)")
+        elif prof is None:
+            print(f"  {n_bound} <= a, b <= {m_bound}: ERRO NÃO alcançável em {n_steps} passos ({t:.3f}s)")
+        else:
+            print(f"  {n_bound} <= a, b <= {m_bound}: ERRO alcançável na profundidade mínima {prof} "
+                  f"(a={m.eval(bmc.a)}, b={m.eval(bmc.b)}, {t:.3f}s)")
+
+    print("-" * 60)
+    return resultados
+
+
+def check_acelerado(n_bits, j, limites, invariante=True):
+    # invariante e segurança sobre a relação acelerada: uma multiplicação completa
+    # cabe em frames_acelerados(n_bits, j) frames, em vez de frames_completos(2^n - 1).
+    # O invariante (não linear) continua caro a partir de 16 bits; a segurança não.
+    k = frames_acelerados(n_bits, j)
+    print(f"=== Relação acelerada: {j} bits por frame, {k} frames ({n_bits} bits) ===")
+    bmc = BMCIncremental(n_bits, j)
+    if invariante:
+        check_invariant_incremental(k, n_bits, bmc)
+    return check_safety_incremental(k, n_bits, limites, bmc)
+
+
+def benchmark_overflow(larguras=(8, 16, 32, 64), codificacoes=CODIFICACOES_OVERFLOW, timeout_ms=60000):
+    # alcançabilidade do ERRO com cada codificação de overflow, em 2n+1 frames. Dois
+    # intervalos por largura: um com ERRO (a, b ~ 2^(n/2)) e um seguro (a, b < 2^(n/2 - 1));
+    # neste, 2n+1 >= frames_completos(b), portanto o unsat é uma prova completa.
+    print(f"{'bits':>5} {'frames':>6} {'limites':>12} " + " ".join(f"{c:>10}" for c in codificacoes))
+    for n_bits in larguras:
+        k = 2 * n_bits + 1
+        meio = n_bits // 2
+        for nome, (lo, hi) in (("erro", (2 ** (meio - 1), 2 ** (meio + 1))),
+                               ("seguro", (1, 2 ** (meio - 1) - 1))):
+            tempos = []
+            for cod in codificacoes:
+                a = z3.BitVec('a', n_bits)
+                b = z3.BitVec('b', n_bits)
+                states = get_state_vecs(k, n_bits)
+                solver = z3.Solver()
+                solver.set("timeout", timeout_ms)
+                solver.add(init_state(states[0], a, b))
+                solver.add(z3.UGE(a, lo), z3.ULE(a, hi), z3.UGE(b, lo), z3.ULE(b, hi))
+                for i in range(k):
+                    solver.add(transition_relation(states[i], states[i + 1], a, b, n_bits, cod))
+                solver.add(z3.Or([error_state(s) for s in states]))
+                inicio = time.perf_counter()
+                res = solver.check()
+                marca = "!" if res == z3.sat else " " if res == z3.unsat else "?"
+                tempos.append(f"{time.perf_counter() - inicio:8.3f}s" + marca)
+            print(f"{n_bits:>5} {k:>6} {nome:>12} " + " ".join(f"{t:>10}" for t in tempos))
+    print("(! = ERRO alcançável, ? = timeout)")
+    print("-" * 60)
+
+
+def transition_relation_inteira(s, s_p, a, b, M):
+    # o mesmo programa sobre inteiros, com o módulo M = 2^n simbólico: fora do ERRO
+    # não há overflow, portanto x << 1, LShR(y, 1), y - 1 e z + x são as operações exatas
+    loc, x, y, z = s
+    loc_p, x_p, y_p, z_p = s_p
+    return z3.Or(
+        z3.And(loc == SKIP, y == 0, loc_p == STOP, x_p == x, y_p == y, z_p == z),
+        z3.And(loc == SKIP, y != 0, y % 2 == 0, loc_p == LEFT, x_p == x, y_p == y, z_p == z),
+        z3.And(loc == SKIP, y % 2 == 1, loc_p == RIGHT, x_p == x, y_p == y, z_p == z),
+        z3.And(loc == LEFT, 2 * x < M, loc_p == SKIP, x_p == 2 * x, y_p == y / 2, z_p == z),
+        z3.And(loc == LEFT, 2 * x >= M, loc_p == ERROR, x_p == x, y_p == y, z_p == z),
+        z3.And(loc == RIGHT, z + x < M, loc_p == SKIP, x_p == x, y_p == y - 1, z_p == z + x),
+        z3.And(loc == RIGHT, z + x >= M, loc_p == ERROR, x_p == x, y_p == y, z_p == z),
+        z3.And(loc == STOP, loc_p == STOP, x_p == x, y_p == y, z_p == z),
+        z3.And(loc == ERROR, loc_p == ERROR, x_p == x, y_p == y, z_p == z)
+    )
+
+
+def invariante_estrutural(s):
+    # a parte linear do invariante: a paridade de y em LEFT/RIGHT e y >= 0
+    loc, x, y, z = s
+    return z3.And(y >= 0, z3.Implies(loc == LEFT, y % 2 == 0), z3.Implies(loc == RIGHT, y % 2 == 1))
+
+
+def invariante_inteiro(s, a, b):
+    loc, x, y, z = s
+    return z3.And(invariante_estrutural(s), z3.Implies(loc != ERROR, x * y + z == a * b))
+
+
+def estado_inteiro(i):
+    return [z3.Int(f'loc_{i}'), z3.Int(f'xi_{i}'), z3.Int(f'yi_{i}'), z3.Int(f'zi_{i}')]
+
+
+# resultado da prova paramétrica: não depende da largura, portanto calcula-se uma vez
+PROVA_PARAMETRICA = {}
+
+
+def provar_invariante_parametrico():
+    # invariante indutivo sobre inteiros, para qualquer M >= 2: inicialização e consecução.
+    # É a única parte não linear (x*y), e não depende de n_bits.
+    if "resultado" in PROVA_PARAMETRICA:
+        return PROVA_PARAMETRICA["resultado"]
+    inicio = time.perf_counter()
+    a, b, M = z3.Ints('a_i b_i M')
+    s, s_p = estado_inteiro(0), estado_inteiro(1)
+    loc, x, y, z = s
+    inicial = z3.And(loc == SKIP, x == a, y == b, z == 0, a >= 0, b >= 0)
+    obrigacoes = {
+        "inicializacao": z3.Implies(inicial, invariante_inteiro(s, a, b)),
+        "consecucao": z3.Implies(z3.And(M >= 2, invariante_inteiro(s, a, b),
+                                        transition_relation_inteira(s, s_p, a, b, M)),
+                                 invariante_inteiro(s_p, a, b)),
+    }
+    resultado = {}
+    for nome, obrigacao in obrigacoes.items():
+        solver = z3.Solver()
+        solver.add(z3.Not(obrigacao))
+        resultado[nome] = solver.check()
+    resultado["tempo"] = time.perf_counter() - inicio
+    PROVA_PARAMETRICA["resultado"] = resultado
+    return resultado
+
+
+def simulacao_largura(n_bits):
+    # com n bits concretos, cada passo que não vai para ERRO é um passo da relação inteira
+    # (com M = 2^n) sobre os valores dos estados; só há shifts e somas, nada de x*y.
+    # Os inteiros são representados com n+2 bits (ZeroExt): todos os termos da relação
+    # ficam abaixo de 2^(n+1), portanto as operações com sinal coincidem com as inteiras
+    # (BV2Int daria o mesmo, mas é muito mais lento a partir de 16 bits)
+    a = z3.BitVec('a', n_bits)
+    b = z3.BitVec('b', n_bits)
+    s, s_p = get_state_vecs(1, n_bits)
+    inteiro = lambda st: [st[0]] + [z3.ZeroExt(2, v) for v in st[1:]]
+    a_i, b_i = z3.ZeroExt(2, a), z3.ZeroExt(2, b)
+    M = z3.BitVecVal(2 ** n_bits, n_bits + 2)
+    resultado = {}
+    solver = z3.Solver()
+    solver.add(init_state(s, a, b))
+    solver.add(z3.Not(z3.And(s[0] == SKIP, inteiro(s)[1] == a_i, inteiro(s)[2] == b_i, inteiro(s)[3] == 0)))
+    resultado["inicializacao"] = solver.check()
+    solver = z3.Solver()
+    solver.add(invariante_estrutural(inteiro(s)), transition_relation(s, s_p, a, b, n_bits), s_p[0] != ERROR)
+    solver.add(z3.Not(transition_relation_inteira(inteiro(s), inteiro(s_p), a_i, b_i, M)))
+    resultado["simulacao"] = solver.check()
+    return resultado
+
+
+def check_invariant_parametrico(n_bits):
+    # o invariante vale com n bits para qualquer número de passos se a prova paramétrica
+    # (em cache) vale e a relação de n bits é simulada pela inteira: x*y + z == a*b sobre
+    # inteiros implica a igualdade módulo 2^n
+    print(f"--- Invariante paramétrico ({n_bits} bits) ---")
+    em_cache = "resultado" in PROVA_PARAMETRICA
+    prova = provar_invariante_parametrico()
+    inicio = time.perf_counter()
+    sim = simulacao_largura(n_bits)
+    t = time.perf_counter() - inicio
+    valido = all(prova[o] == z3.unsat for o in ("inicializacao", "consecucao")) and \
+        all(r == z3.unsat for r in sim.values())
+    origem = "em cache" if em_cache else f"{prova['tempo']:.3f}s"
+    if valido:
+        print("Resultado: Invariante (x*y + z == a*b) válido para qualquer número de passos.")
+    else:
+        print(f"Resultado: prova paramétrica inconclusiva: {prova} {sim}")
+    print(f"Tempo: prova paramétrica {origem}, simulação com {n_bits} bits {t:.3f}s")
+    print("-" * 60)
+    return valido
+
+
+def verificar_config(config):
+    # uma configuração do varrimento, corrida num processo do pool:
+    # (propriedade, n_bits, k, n_bound, m_bound, overflow) com propriedade "invariante" ou "seguranca"
+    propriedade, n_bits, k, n_bound, m_bound, overflow = config
+    inicio = time.perf_counter()
+    bmc = BMCIncremental(n_bits, overflow=overflow)
+    alvo = bmc.violacao_invariante if propriedade == "invariante" else bmc.erro
+    prof, m = bmc.procurar(k, alvo, [bmc.limites(n_bound, m_bound)])
+    # inconclusivo: profundidade onde o solver desistiu (a linha não decide nenhuma outra)
+    inconclusivo = None
+    if prof == "unknown":
+        prof, inconclusivo, m = None, m, None
+    testemunha = None if m is None else (m.eval(bmc.a).as_long(), m.eval(bmc.b).as_long())
+    return {"config": config, "prof": prof, "prof_exata": True, "testemunha": testemunha,
+            "inconclusivo": inconclusivo, "tempo": time.perf_counter() - inicio, "origem": None}
+
+
+def implica(linha, config):
+    # o resultado já conhecido (linha) decide config sem a correr?
+    #  - uma testemunha (a, b) que leva ao ERRO em d passos com n bits leva ao ERRO em <= d passos
+    #    com menos bits (se a, b cabem): a execução é a mesma até ao primeiro overflow, que na
+    #    largura menor acontece no mesmo passo ou antes
+    #  - ERRO inalcançável em k passos com n bits e limites [lo, hi] (hi < 2^n) é-o também com mais
+    #    bits, menos passos e limites contidos (contrapositivo do anterior); se k >= frames_completos(hi)
+    #    todas as execuções já terminaram e o resultado vale para qualquer número de passos
+    # para o invariante só se aproveita a mesma largura (subintervalos / testemunha no intervalo)
+    # a codificação de overflow não conta: todas descrevem a mesma semântica
+    prop0, n0, k0, lo0, hi0, _ = linha["config"]
+    prop, n, k, lo, hi, _ = config
+    if prop != prop0 or hi0 >= 2 ** n0 or hi >= 2 ** n or linha["inconclusivo"] is not None:
+        return False
+    if linha["prof"] is not None:
+        a, b = linha["testemunha"]
+        largura_ok = n <= n0 if prop == "seguranca" else n == n0
+        return (largura_ok and k >= linha["prof"] and lo <= a <= hi and lo <= b <= hi
+                and a < 2 ** n and b < 2 ** n)
+    if linha["tempo"] is None:
+        return False
+    largura_ok = n >= n0 if prop == "seguranca" else n == n0
+    passos_ok = k <= k0 or k0 >= frames_completos(hi0)
+    return largura_ok and passos_ok and lo0 <= lo and hi <= hi0
+
+
+COLUNAS_VARRIMENTO = ["propriedade", "n_bits", "k", "limites", "resultado", "tempo"]
+
+
+def imprimir_varrimento(linha):
+    propriedade, n_bits, k, n_bound, m_bound, _ = linha["config"]
+    if linha["inconclusivo"] is not None:
+        resultado = f"inconclusivo (prof {linha['inconclusivo']})"
+    elif linha["prof"] is None:
+        resultado = "seguro" if propriedade == "seguranca" else "válido"
+    else:
+        prof = linha["prof"] if linha["prof_exata"] else f"<= {linha['prof']}"
+        resultado = f"prof {prof} a,b={linha['testemunha']}"
+    tempo = "podado" if linha["tempo"] is None else f"{linha['tempo']:.3f}s"
+    print(f"{propriedade:>11} {n_bits:>6} {k:>4} {f'[{n_bound},{m_bound}]':>14} {resultado:>28} {tempo:>9}", flush=True)
+
+
+def varrer(configs, processos=None, ao_terminar=imprimir_varrimento):
+    # distribui as configurações por um pool de processos e devolve as linhas pela ordem em que
+    # terminam; cada resultado cancela as configurações pendentes que já decide (ver implica),
+    # que ficam com tempo None e a configuração que as decidiu em "origem". Numa linha podada por
+    # uma testemunha, prof é só um majorante da profundidade mínima (prof_exata False)
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    linhas = []
+    print(" ".join(f"{c:>{w}}" for c, w in zip(COLUNAS_VARRIMENTO, (11, 6, 4, 14, 28, 9))))
+    with ProcessPoolExecutor(processos, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futuros = {pool.submit(verificar_config, c): c for c in configs}
+        pendentes = set(futuros)
+        for f in as_completed(futuros):
+            if f.cancelled():
+                continue
+            pendentes.discard(f)
+            linha = f.result()
+            linhas.append(linha)
+            ao_terminar(linha)
+            for g in list(pendentes):
+                if implica(linha, futuros[g]) and g.cancel():
+                    pendentes.discard(g)
+                    podada = {"config": futuros[g], "prof": linha["prof"], "prof_exata": linha["prof"] is None,
+                              "testemunha": linha["testemunha"], "inconclusivo": None, "tempo": None,
+                              "origem": linha["config"]}
+                    linhas.append(podada)
+                    ao_terminar(podada)
+    print("-" * 60)
+    return linhas
+
+
+def configs_varrimento(larguras, limites, propriedades=("invariante", "seguranca"), k=None, overflow="original"):
+    # k por omissão: frames_completos(hi), o suficiente para qualquer multiplicação com b <= hi
+    return [(p, n, k or frames_completos(min(hi, 2 ** n - 1)), lo, hi, overflow)
+            for p in propriedades for n in larguras for (lo, hi) in limites]
+
+
+if __name__ == "__main__":
+    # por omissão só as verificações originais e o BMC incremental; as secções caras a pedido
+    parser = argparse.ArgumentParser(description="TP2 Ex2: verificação do multiplicador com BMC.")
+    parser.add_argument("--acelerado", action="store_true",
+                        help="relação acelerada: multiplicações completas a 8 e 32 bits")
+    parser.add_argument("--varrimento", action="store_true",
+                        help="varrimento paralelo de larguras e intervalos (8 a 24 bits)")
+    parser.add_argument("--benchmark-overflow", action="store_true",
+                        help="comparar as codificações de overflow a 8 e 16 bits (timeout de 30 s)")
+    parser.add_argument("--parametrico", action="store_true",
+                        help="invariante provado sobre inteiros e verificado a 8, 16, 32 e 64 bits")
+    args = parser.parse_args()
+
+    N_BITS = 8 
+    K_STEPS_INV = 15 
+    N_STEPS_SAFETY = 15
+    N_BOUND = 10
+    M_BOUND = 20
+
+    check_invariant(k_steps=K_STEPS_INV, n_bits=N_BITS)
+    
+    check_safety(
+        n_steps=N_STEPS_SAFETY, 
+        n_bits=N_BITS, 
+        n_bound=N_BOUND, 
+        m_bound=M_BOUND
+    )
+
+    # as mesmas verificações com BMC incremental: os frames são partilhados entre as duas
+    bmc = BMCIncremental(N_BITS)
+    check_invariant_incremental(K_STEPS_INV, N_BITS, bmc)
+    check_safety_incremental(N_STEPS_SAFETY, N_BITS, [(N_BOUND, M_BOUND), (1, 10), (20, 40)], bmc)
+
+    # multiplicações completas a 8 e 32 bits em poucos frames
+    if args.acelerado:
+        check_acelerado(N_BITS, 4, [(N_BOUND, M_BOUND), (1, 10), (20, 40)])
+        check_acelerado(32, 8, [(1, 2 ** 16 - 1), (2 ** 15, 2 ** 17)], invariante=False)
+
+    if args.benchmark_overflow:
+        benchmark_overflow(larguras=(8, 16), timeout_ms=30000)
+
+    # varrimento paralelo: larguras e intervalos, com poda dos resultados já implicados
+    if args.varrimento:
+        varrer(configs_varrimento((8,), [(N_BOUND, M_BOUND), (1, 10), (20, 40)], ("invariante",), k=K_STEPS_INV)
+               + configs_varrimento((8, 12, 16, 24), [(N_BOUND, M_BOUND), (1, 10), (20, 40), (1, 200)],
+                                    ("seguranca",)))
+
+    # o invariante provado uma vez sobre inteiros e instanciado em cada largura
+    if args.parametrico:
+        for n_bits in (8, 16, 32, 64):
+            check_invariant_parametrico(n_bits)
@@ -0,0 +1,1087 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from fractions import Fraction
+
+import numpy as np
+import z3
+
+N = 16
+
+
+def largura_estendida(bits):
+    # curr - q*next com q < 2^N sem sinal e |next|, |curr| <= 2^(N-1) (ou < 2^N sem sinal)
+    # fica em (-2^(2N), 2^N): cabe em 2N+1 bits com sinal, portanto não há wrap-around
+    return 2 * bits + 1
+
+
+EXT = largura_estendida(N)
+
+
+# configurações do Spacer por nome; "padrao" é a que solve_horn sempre usou
+PERFIS_SPACER = {
+    "padrao": {'spacer.order_children': 2},
+    "ordem0": {'spacer.order_children': 0},
+    "sem_generalizacao": {'spacer.order_children': 2, 'spacer.use_inductive_generalizer': False},
+    "global": {'spacer.order_children': 2, 'spacer.global': True, 'spacer.gg.conjecture': True,
+               'spacer.gg.concretize': True, 'spacer.gg.subsume': True},
+    "restarts": {'spacer.order_children': 2, 'spacer.restarts': True, 'spacer.restart_initial_threshold': 10},
+    "semente": {'spacer.order_children': 1, 'spacer.random_seed': 7},
+}
+
+
+def solver_horn(perfil="padrao", max_unfold=10, timeout_ms=10000):
+    s = z3.SolverFor('HORN')
+    s.set('engine', 'spacer')
+    for chave, valor in PERFIS_SPACER[perfil].items():
+        s.set(chave, valor)
+    s.set('timeout', timeout_ms)
+    if max_unfold > 0:
+        s.set('spacer.max_level', max_unfold)
+    return s
+
+
+def solve_horn(chc, max_unfold=10, timeout_ms=10000, perfil="padrao"):
+    z3.set_param(verbose=0)
+    s = solver_horn(perfil, max_unfold, timeout_ms)
+    s.add(chc)
+    res = s.check()
+
+    answer = None
+    if res == z3.sat:
+        try:
+            answer = s.model()
+        except:
+            pass
+    elif res == z3.unsat:
+        try:
+            answer = s.proof()
+        except:
+            pass
+
+    return res, answer
+
+
+class Ts(object):
+    def __init__(self, name='Ts'):
+        self.name = name
+        self._vars = []
+        self._inputs = []
+        self.Tr = z3.BoolVal(True)
+        self.Init = z3.BoolVal(True)
+        self.Bad = z3.BoolVal(False)
+        # variáveis de cada frame e Tr instanciado entre frames, partilhados pelos motores
+        # (bmc, imc, ...); _tr_base é o Tr de onde saiu a cache
+        self._frames = []
+        self._tr_frames = {}
+        self._tr_base = None
+
+    def add_var(self, sort, name=None):
+        self._limpar_frames()
+        idx = len(self._vars)
+        pre_name = str(name) if name else f'v_{idx}'
+        post_name = (str(name) + "'") if name else f'v_out_{idx}'
+        v_in = z3.Const(pre_name, sort)
+        v_out = z3.Const(post_name, sort)
+        self._vars.append((v_in, v_out))
+        return (v_in, v_out)
+
+    def add_input(self, sort, name=None):
+        self._limpar_frames()
+        v = z3.Const(name if name else f'i_{len(self._inputs)}', sort)
+        self._inputs.append(v)
+        return v
+
+    def pre_vars(self):
+        return [u for (u, v) in self._vars]
+
+    def post_vars(self):
+        return [v for (u, v) in self._vars]
+
+    def all(self):
+        return self.pre_vars() + self.post_vars() + self._inputs
+
+    def sig(self):
+        return [v.sort() for (u, v) in self._vars]
+
+    def _limpar_frames(self):
+        self._frames = []
+        self._tr_frames = {}
+        self._tr_base = None
+
+    def _frame(self, i):
+        # (estado, entradas) do frame i, criados uma vez por frame
+        while len(self._frames) <= i:
+            j = len(self._frames)
+            self._frames.append(([z3.Const(f'{v}_{j}', v.sort()) for v in self.pre_vars()],
+                                 [z3.Const(f'{v}_{j}', v.sort()) for v in self._inputs]))
+        return self._frames[i]
+
+    def frame(self, i):
+        # variáveis de estado no frame i
+        return self._frame(i)[0]
+
+    def at(self, f, i):
+        # f sobre as variáveis de estado (pré) instanciada no frame i
+        return z3.substitute(f, list(zip(self.pre_vars(), self.frame(i))))
+
+    def tr_at(self, i):
+        # Tr entre os frames i e i+1 (as entradas ficam no frame i); o AST é guardado e
+        # reaproveitado enquanto T.Tr não mudar
+        if self._tr_base is None or not self._tr_base.eq(self.Tr):
+            self._tr_frames = {}
+            self._tr_base = self.Tr
+        if i not in self._tr_frames:
+            estado, entradas = self._frame(i)
+            self._tr_frames[i] = z3.substitute(self.Tr, list(zip(self.pre_vars(), estado)) +
+                                               list(zip(self.post_vars(), self.frame(i + 1))) +
+                                               list(zip(self._inputs, entradas)))
+        return self._tr_frames[i]
+
+    def unroll(self, k, inicio=0):
+        # Tr_inicio, ..., Tr_{k-1}, gerados à medida que são pedidos
+        for i in range(inicio, k):
+            yield self.tr_at(i)
+
+
+# get_id() da fórmula -> (fórmula, {get_id(): variável}); a fórmula fica guardada para o id
+# não ser reutilizado pelo z3 enquanto a entrada existir. A cache global guarda no máximo
+# MAX_CACHE_VARS_LIVRES fórmulas (sai a usada há mais tempo); quem gera muitas fórmulas de vida
+# curta (imc) passa a sua própria cache
+CACHE_VARS_LIVRES = {}
+MAX_CACHE_VARS_LIVRES = 256
+
+
+def free_arith_vars(fml, cache=None, maximo=MAX_CACHE_VARS_LIVRES):
+    # travessia iterativa do DAG com os nós identificados por get_id(); só as raízes das
+    # chamadas são guardadas, não os nós interiores. Uma sub-fórmula que já foi raiz de uma
+    # chamada anterior (T.Tr dentro de um desenrolamento, por exemplo) vem da cache sem ser
+    # percorrida outra vez, e conta como usada para a ordem LRU
+    if cache is None:
+        cache = CACHE_VARS_LIVRES
+    raiz = fml.get_id()
+    if raiz in cache:
+        cache[raiz] = cache.pop(raiz)
+        return set(cache[raiz][1].values())
+    # percorre os ponteiros da API C: f.children() criaria um wrapper Python por nó;
+    # só as variáveis encontradas são embrulhadas em ExprRef
+    ctx = fml.ctx
+    c = ctx.ref()
+    vistos = set()
+    vars_ids = {}
+    pilha = [fml.as_ast()]
+    while pilha:
+        a = pilha.pop()
+        i = z3.Z3_get_ast_id(c, a)
+        if i in vistos:
+            continue
+        vistos.add(i)
+        if i != raiz and i in cache:
+            cache[i] = cache.pop(i)
+            vars_ids.update(cache[i][1])
+            continue
+        tipo = z3.Z3_get_ast_kind(c, a)
+        if tipo == z3.Z3_APP_AST:
+            app = z3.Z3_to_app(c, a)
+            n = z3.Z3_get_app_num_args(c, app)
+            if n == 0:
+                if z3.Z3_get_decl_kind(c, z3.Z3_get_app_decl(c, app)) == z3.Z3_OP_UNINTERPRETED:
+                    vars_ids[i] = z3.FuncDeclRef(z3.Z3_get_app_decl(c, app), ctx)()
+            else:
+                pilha.extend(z3.Z3_get_app_arg(c, app, j) for j in range(n))
+        elif tipo == z3.Z3_QUANTIFIER_AST:
+            pilha.append(z3.Z3_get_quantifier_body(c, a))
+    cache[raiz] = (fml, vars_ids)
+    while maximo is not None and len(cache) > maximo:
+        del cache[next(iter(cache))]
+    return set(vars_ids.values())
+
+
+def free_arith_vars_recursivo(fml):
+    # a versão original, recursiva e com os nós como chave; fica só para comparar em benchmark_vars_livres
+    seen = set()
+    vars_set = set()
+    def visit(f):
+        if f in seen: return
+        seen.add(f)
+        if z3.is_const(f) and f.decl().kind() == z3.Z3_OP_UNINTERPRETED:
+            vars_set.add(f)
+        for child in f.children():
+            visit(child)
+    visit(fml)
+    return vars_set
+
+
+def contar_nos(fml):
+    vistos = set()
+    pilha = [fml]
+    while pilha:
+        f = pilha.pop()
+        if f.get_id() not in vistos:
+            vistos.add(f.get_id())
+            pilha.extend(f.children())
+    return len(vistos)
+
+
+def benchmark_vars_livres(ks=(10, 200, 2000), profundidade=20000):
+    # desenrolamentos do EEA com k frames e uma cadeia de somas muito profunda
+    # (a versão recursiva esgota a pilha de recursão do Python nesta última)
+    import ctypes
+    T = create_eea_system(16)
+    formulas = [(f"EEA k={k}", z3.And(list(T.unroll(k)))) for k in ks]
+    xs = z3.Ints(' '.join(f'c_{i}' for i in range(profundidade)))
+    cadeia = xs[0]
+    for x in xs[1:]:
+        cadeia = x + cadeia
+    formulas.append((f"cadeia {profundidade}", cadeia > 0))
+
+    print(f"{'formula':>16} {'nos':>8} {'vars':>6} {'iterativa':>10} {'cache':>9} {'recursiva':>10}")
+    for nome, fml in formulas:
+        nos = contar_nos(fml)
+        inicio = time.perf_counter()
+        vs = free_arith_vars(fml, cache={})
+        t_it = time.perf_counter() - inicio
+        cache = {}
+        free_arith_vars(fml, cache)
+        inicio = time.perf_counter()
+        free_arith_vars(fml, cache)
+        t_cache = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        try:
+            free_arith_vars_recursivo(fml)
+            t_rec = f"{time.perf_counter() - inicio:9.3f}s"
+        except (RecursionError, ctypes.ArgumentError):
+            # o z3 embrulha o RecursionError num ArgumentError do ctypes
+            t_rec = "recursão"
+        except z3.Z3Exception:
+            # colisão de hash entre nós de sorts diferentes: o `in seen` chama __eq__ do z3
+            t_rec = "erro"
+        print(f"{nome:>16} {nos:>8} {len(vs):>6} {t_it:>9.3f}s {t_cache:>8.4f}s {t_rec:>10}")
+
+def vc_gen(T):
+    Inv = z3.Function('Inv', *(T.sig() + [z3.BoolSort()]))
+    InvPre = Inv(*T.pre_vars())
+    InvPost = Inv(*T.post_vars())
+    all_vars = T.all()
+
+    vc_init = z3.ForAll(all_vars, z3.Implies(T.Init, InvPre))
+    vc_ind = z3.ForAll(all_vars, z3.Implies(z3.And(InvPre, T.Tr), InvPost))
+    vc_bad = z3.ForAll(all_vars, z3.Implies(z3.And(InvPre, T.Bad), z3.BoolVal(False)))
+
+    return [vc_init, vc_ind, vc_bad], InvPre
+
+def interpolate(A, B, timeout_ms=10000, cache=None):
+    As = free_arith_vars(A, cache)
+    Bs = free_arith_vars(B, cache)
+    shared = list(As & Bs)
+
+    sig = [s.sort() for s in shared] + [z3.BoolSort()]
+    Itp = z3.Function('Itp', *sig)
+    args = shared
+
+    left = z3.ForAll(list(As), z3.Implies(A, Itp(*args)))
+    right = z3.ForAll(list(Bs), z3.Implies(Itp(*args), z3.Not(B)))
+
+    res, ans = solve_horn([left, right], timeout_ms=timeout_ms)
+    if res == z3.sat:
+        return ans.eval(Itp(*args))
+    return None
+
+
+FICHEIRO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'invariantes_cache.json')
+
+
+class CacheInvariantes(object):
+    # invariantes sintetizados pelo Spacer, guardados em JSON entre execuções (por omissão ao
+    # lado deste módulo); a chave é o sha256 de Init/Tr/Bad e da assinatura (nomes e sorts
+    # das variáveis) do Ts
+    def __init__(self, ficheiro=FICHEIRO_CACHE):
+        self.ficheiro = ficheiro
+        self.entradas = {}
+        try:
+            with open(ficheiro) as f:
+                self.entradas = json.load(f)
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def chave(self, T):
+        h = hashlib.sha256()
+        for v in T.all():
+            h.update(f'{v}:{v.sort()};'.encode())
+        for f in (T.Init, T.Tr, T.Bad):
+            h.update(f.sexpr().encode())
+        return h.hexdigest()
+
+    def obter(self, T):
+        entrada = self.entradas.get(self.chave(T))
+        if entrada is None:
+            return None
+        decls = {str(v): v for v in T.all()}
+        return z3.parse_smt2_string(f"(assert {entrada['invariante']})", decls=decls)[0]
+
+    def guardar(self, T, inv):
+        self.entradas[self.chave(T)] = {'nome': T.name, 'invariante': inv.sexpr()}
+        with open(self.ficheiro, 'w') as f:
+            json.dump(self.entradas, f, indent=1)
+
+
+def validar_invariante(T, inv, timeout_ms=10000):
+    # as três VCs de vc_gen com o invariante concreto: Init -> Inv, Inv /\ Tr -> Inv', Inv /\ Bad -> False
+    inv_post = z3.substitute(inv, list(zip(T.pre_vars(), T.post_vars())))
+    for vc in (z3.And(T.Init, z3.Not(inv)),
+               z3.And(inv, T.Tr, z3.Not(inv_post)),
+               z3.And(inv, T.Bad)):
+        s = z3.Solver()
+        s.set('timeout', timeout_ms)
+        s.add(vc)
+        if s.check() != z3.unsat:
+            return False
+    return True
+
+
+def verificar_com_cache(T, cache=None, timeout_ms=10000, max_unfold=10):
+    # tenta primeiro o invariante em cache (três verificações SMT); se não houver ou já não
+    # for válido, corre o Spacer e guarda o invariante novo.
+    # Devolve (resultado, resposta do Spacer, invariante, origem) com origem "cache" ou "spacer"
+    cache = cache or CacheInvariantes()
+    inv = cache.obter(T)
+    if inv is not None and validar_invariante(T, inv, timeout_ms):
+        return z3.sat, None, inv, "cache"
+    vcs, inv_decl = vc_gen(T)
+    res, ans = solve_horn(vcs, max_unfold=max_unfold, timeout_ms=timeout_ms)
+    inv = None
+    if res == z3.sat and ans is not None:
+        inv = ans.eval(inv_decl)
+        cache.guardar(T, inv)
+    return res, ans, inv, "spacer"
+
+
+def fixedpoint_horn(T, perfil="padrao", max_unfold=10, timeout_ms=10000):
+    # as mesmas cláusulas de vc_gen num Fixedpoint, com Err como consulta: ao contrário do
+    # solver HORN, o Fixedpoint devolve a refutação (a derivação de Err) quando o erro é alcançável
+    fp = z3.Fixedpoint()
+    fp.set('engine', 'spacer')
+    for chave, valor in PERFIS_SPACER[perfil].items():
+        fp.set(chave, valor)
+    fp.set('timeout', timeout_ms)
+    if max_unfold > 0:
+        fp.set('spacer.max_level', max_unfold)
+    Inv = z3.Function('Inv', *(T.sig() + [z3.BoolSort()]))
+    Err = z3.Function('Err', z3.BoolSort())
+    fp.register_relation(Inv, Err)
+    fp.declare_var(*T.all())
+    fp.rule(Inv(*T.pre_vars()), T.Init)
+    fp.rule(Inv(*T.post_vars()), [Inv(*T.pre_vars()), T.Tr])
+    fp.rule(Err(), [Inv(*T.pre_vars()), T.Bad])
+    return fp, Inv, Err()
+
+
+def traco_refutacao(prova, Inv):
+    # percorre a refutação em pós-ordem (iterativa, nós por get_id()); a conclusão de cada passo
+    # é o último argumento, e as conclusões Inv(...) ground são os estados do caminho, da
+    # instância de Init até ao estado de erro. Gera um tuplo de inteiros por estado
+    vistos = set()
+    pilha = [(prova, False)]
+    while pilha:
+        p, expandido = pilha.pop()
+        if not z3.is_app(p) or p.num_args() == 0:
+            continue
+        if not expandido:
+            if p.get_id() in vistos:
+                continue
+            vistos.add(p.get_id())
+            pilha.append((p, True))
+            pilha.extend((c, False) for c in reversed(p.children()[:-1]))
+            continue
+        facto = p.arg(p.num_args() - 1)
+        if z3.is_app(facto) and facto.decl().eq(Inv) and facto.get_id() not in vistos:
+            vistos.add(facto.get_id())
+            yield tuple(v.as_long() for v in facto.children())
+
+
+def contra_exemplo_chc(T, perfil="padrao", max_unfold=10, timeout_ms=10000):
+    # devolve (resultado, linhas) com o resultado no sentido de solve_horn (unsat = inseguro);
+    # quando é unsat, linhas gera os estados do contra-exemplo (valores de T.pre_vars(), por ordem)
+    fp, Inv, erro = fixedpoint_horn(T, perfil, max_unfold, timeout_ms)
+    res = fp.query(erro)
+    if res == z3.sat:
+        return z3.unsat, traco_refutacao(fp.get_answer(), Inv)
+    return (z3.sat if res == z3.unsat else res), None
+
+
+def horn_smt2(chc):
+    # as CHCs em SMT-LIB: os objetos do z3 não passam entre processos
+    s = z3.Solver()
+    s.add(chc)
+    return s.sexpr()
+
+
+def corrida_trabalhador(fila, perfil, smt2, max_unfold, timeout_ms):
+    inicio = time.perf_counter()
+    s = solver_horn(perfil, max_unfold, timeout_ms)
+    s.from_string(smt2)
+    res = s.check()
+    resposta = s.model().sexpr() if res == z3.sat else None
+    fila.put((perfil, str(res), resposta, time.perf_counter() - inicio))
+
+
+def corrida_horn(chc, perfis=None, timeout_ms=1000, fator=2, timeout_max_ms=60000, max_unfold=0,
+                 problema=None, registo=None):
+    # corre os perfis em paralelo, cada um no seu processo, e fica com a primeira resposta
+    # definitiva (sat/unsat); se todos dão unknown, repete com o timeout multiplicado por fator.
+    # Devolve (resultado, perfil vencedor, modelo em SMT-LIB ou None, timeout da ronda, tempo);
+    # com registo (ficheiro) acrescenta uma linha JSON por problema resolvido
+    import multiprocessing
+    import queue
+    perfis = perfis or list(PERFIS_SPACER)
+    smt2 = horn_smt2(chc)
+    ctx = multiprocessing.get_context("spawn")
+    inicio = time.perf_counter()
+    resposta = (z3.unknown, None, None, None)
+    while resposta[0] == z3.unknown and timeout_ms <= timeout_max_ms:
+        fila = ctx.Queue()
+        processos = [ctx.Process(target=corrida_trabalhador,
+                                 args=(fila, perfil, smt2, max_unfold, timeout_ms), daemon=True)
+                     for perfil in perfis]
+        for p in processos:
+            p.start()
+        try:
+            pendentes = len(processos)
+            while pendentes:
+                try:
+                    perfil, res, modelo, _ = fila.get(timeout=1)
+                except queue.Empty:
+                    if not any(p.is_alive() for p in processos) and fila.empty():
+                        break
+                    continue
+                pendentes -= 1
+                if res in ("sat", "unsat"):
+                    resposta = (z3.sat if res == "sat" else z3.unsat, perfil, modelo, timeout_ms)
+                    break
+        finally:
+            for p in processos:
+                if p.is_alive():
+                    p.terminate()
+            for p in processos:
+                p.join()
+        if resposta[0] == z3.unknown:
+            timeout_ms *= fator
+    tempo = time.perf_counter() - inicio
+    if registo is not None and resposta[1] is not None:
+        with open(registo, "a") as f:
+            f.write(json.dumps({"problema": problema, "perfil": resposta[1], "resultado": str(resposta[0]),
+                                "timeout_ms": resposta[3], "tempo": tempo}) + "\n")
+    return resposta + (tempo,)
+
+
+def vitorias_perfis(registo):
+    # quantas vezes cada perfil ganhou, por problema, a partir do registo de corrida_horn
+    from collections import Counter
+    vitorias = {}
+    with open(registo) as f:
+        for linha in f:
+            entrada = json.loads(linha)
+            vitorias.setdefault(entrada["problema"], Counter())[entrada["perfil"]] += 1
+    return vitorias
+
+
+def calc_checked_next(curr_bv, q_bv, next_bv, signed_check, bits=N, ext=None):
+    # curr - q*next calculado em ext bits (por omissão 2*bits+1, ver largura_estendida);
+    # o overflow é decidido com comparações sobre bit-vectors, sem BV2Int
+    ext = ext or largura_estendida(bits)
+    if signed_check:
+        curr_ext = z3.SignExt(ext - bits, curr_bv)
+        q_ext    = z3.ZeroExt(ext - bits, q_bv)
+        next_ext = z3.SignExt(ext - bits, next_bv)
+    else:
+        curr_ext = z3.ZeroExt(ext - bits, curr_bv)
+        q_ext    = z3.ZeroExt(ext - bits, q_bv)
+        next_ext = z3.ZeroExt(ext - bits, next_bv)
+
+    term_ext = q_ext * next_ext
+    res_ext  = curr_ext - term_ext
+
+    if signed_check:
+        min_ext = z3.BitVecVal(-(1 << (bits-1)), ext)
+        max_ext = z3.BitVecVal((1 << (bits-1)) - 1, ext)
+        is_overflow = z3.Or(res_ext < min_ext, res_ext > max_ext)
+    else:
+        # um resultado negativo dá wrap-around para um valor acima de 2^bits - 1
+        is_overflow = z3.UGT(res_ext, z3.BitVecVal((1 << bits) - 1, ext))
+
+    res_trunc = z3.Extract(bits-1, 0, res_ext)
+
+    return res_trunc, is_overflow
+
+
+def create_eea_system(bits=16, ext=None):
+    T = Ts('EEA_SFOTS')
+    bv = z3.BitVecSort(bits)
+
+    r, r_out = T.add_var(bv, 'r')
+    rp, rp_out = T.add_var(bv, 'rp')
+    s, s_out = T.add_var(bv, 's')
+    sp, sp_out = T.add_var(bv, 'sp')
+    t, t_out = T.add_var(bv, 't')
+    tp, tp_out = T.add_var(bv, 'tp')
+
+    a, a_out = T.add_var(bv, 'a')
+    b, b_out = T.add_var(bv, 'b')
+
+    zero_bv = z3.BitVecVal(0, bits)
+    one_bv = z3.BitVecVal(1, bits)
+
+    T.Init = z3.And(
+        z3.UGT(a, zero_bv), z3.UGT(b, zero_bv),
+        r == a, rp == b,
+        s == one_bv, sp == zero_bv,
+        t == zero_bv, tp == one_bv
+    )
+
+    q = z3.UDiv(r, rp)
+
+    next_rp_val, ovf_r = calc_checked_next(r, q, rp, signed_check=False, bits=bits, ext=ext)
+    next_sp_val, ovf_s = calc_checked_next(s, q, sp, signed_check=True, bits=bits, ext=ext)
+    next_tp_val, ovf_t = calc_checked_next(t, q, tp, signed_check=True, bits=bits, ext=ext)
+
+    any_overflow = z3.Or(ovf_r, ovf_s, ovf_t)
+    loop_cond = (rp != zero_bv)
+
+    T.Tr = z3.If(
+        loop_cond,
+        z3.If(
+            z3.Not(any_overflow),
+            z3.And(
+                r_out == rp, rp_out == next_rp_val,
+                s_out == sp, sp_out == next_sp_val,
+                t_out == tp, tp_out == next_tp_val,
+                a_out == a, b_out == b
+            ),
+            z3.And(
+                r_out == zero_bv, rp_out == zero_bv,
+                s_out == zero_bv, sp_out == zero_bv,
+                t_out == zero_bv, tp_out == zero_bv,
+                a_out == a, b_out == b
+            )
+        ),
+        z3.And(
+            r_out == r, rp_out == rp,
+            s_out == s, sp_out == sp,
+            t_out == t, tp_out == tp,
+            a_out == a, b_out == b
+        )
+    )
+
+    T.Bad = (r == zero_bv)
+
+    return T
+
+
+def _inteiros_eea(bits):
+    # int64 chega enquanto curr - q*next (|.| < 2^(2*bits+1)) cabe em 63 bits; acima disso
+    # usa inteiros Python (dtype object), mais lentos mas exatos
+    return np.int64 if bits <= 31 else object
+
+
+def _envolver(v, bits, com_sinal):
+    # v reduzido a bits bits (o wrap-around dos bit-vectors), lido com ou sem sinal
+    v = v & ((1 << bits) - 1)
+    if com_sinal:
+        v = np.where(v >= (1 << (bits - 1)), v - (1 << bits), v)
+    return v
+
+
+def proximo_concreto(curr, q, prox, com_sinal, bits=N, ext=None):
+    # calc_checked_next sobre arrays: r, rp e q sem sinal, s e t com sinal; com ext menor que
+    # largura_estendida(bits) o resultado intermédio também dá a volta, como no bit-vector
+    ext = ext or largura_estendida(bits)
+    res = curr - q * prox
+    if ext < largura_estendida(bits):
+        res = _envolver(res, ext, com_sinal)
+    if com_sinal:
+        ovf = (res < -(1 << (bits - 1))) | (res > (1 << (bits - 1)) - 1)
+    else:
+        ovf = (res < 0) | (res > (1 << bits) - 1)
+    return _envolver(res, bits, com_sinal), ovf
+
+
+def passo_eea(r, rp, s, sp, t, tp, bits=N, ext=None):
+    # a transição de create_eea_system em todas as pistas (todas com rp != 0);
+    # com overflow o estado passa a zeros. Devolve o estado seguinte e a máscara de overflow
+    q = r // rp
+    nrp, ovf_r = proximo_concreto(r, q, rp, False, bits, ext)
+    nsp, ovf_s = proximo_concreto(s, q, sp, True, bits, ext)
+    ntp, ovf_t = proximo_concreto(t, q, tp, True, bits, ext)
+    ovf = ovf_r | ovf_s | ovf_t
+    return tuple(np.where(ovf, 0, v) for v in (rp, nrp, sp, nsp, tp, ntp)), ovf
+
+
+def valores_limite(bits):
+    # 1, 2, os extremos com e sem sinal e números de Fibonacci (o pior caso do EEA)
+    topo = 1 << bits
+    vs = {1, 2, 3, topo // 2 - 1, topo // 2, topo // 2 + 1, topo - 2, topo - 1}
+    f0, f1 = 1, 2
+    while f1 < topo:
+        vs.add(f1)
+        f0, f1 = f1, f0 + f1
+    return sorted(v for v in vs if 0 < v < topo)
+
+
+def _aleatorios(rng, bits, n):
+    # n valores em [1, 2^bits - 1]; com dtype object compõe palavras de 32 bits
+    if _inteiros_eea(bits) is np.int64:
+        return rng.integers(1, 1 << bits, size=n, dtype=np.int64)
+    v = np.zeros(n, dtype=object)
+    for _ in range((bits + 31) // 32):
+        v = (v << 32) | rng.integers(0, 1 << 32, size=n, dtype=np.int64).astype(object)
+    return v % ((1 << bits) - 1) + 1
+
+
+def fuzz_eea(bits=N, n=10**6, ext=None, semente=0, bloco=1 << 16):
+    # executa o ciclo do EEA concretamente nos pares (a, b) dos valores limite e em pares
+    # aleatórios até n, em blocos; as pistas terminadas (rp == 0 ou r == 0) saem do bloco.
+    # Devolve (testados, a, b, passos) com um contra-exemplo (r == 0 ao fim de passos) por índice
+    tipo = _inteiros_eea(bits)
+    rng = np.random.default_rng(semente)
+    limite = np.array(valores_limite(bits), dtype=tipo)
+    la, lb = np.meshgrid(limite, limite)
+    la, lb = la.ravel()[:n], lb.ravel()[:n]
+    maus = ([], [], [])
+    testados = 0
+    while testados < n:
+        if testados < len(la):
+            a, b = la[testados:testados + bloco], lb[testados:testados + bloco]
+        else:
+            m = min(bloco, n - testados)
+            a, b = _aleatorios(rng, bits, m), _aleatorios(rng, bits, m)
+        testados += len(a)
+        pistas = np.arange(len(a))
+        um, zero = np.ones(len(a), dtype=tipo), np.zeros(len(a), dtype=tipo)
+        estado = (a, b, um, zero, zero, um)
+        passos = 0
+        while len(pistas):
+            estado, _ = passo_eea(*estado, bits=bits, ext=ext)
+            passos += 1
+            erro = estado[0] == 0
+            if erro.any():
+                maus[0].append(a[pistas[erro]])
+                maus[1].append(b[pistas[erro]])
+                maus[2].append(np.full(int(erro.sum()), passos))
+            continua = ~erro & (estado[1] != 0)
+            pistas = pistas[continua]
+            estado = tuple(v[continua] for v in estado)
+    if not maus[0]:
+        return testados, np.array([], dtype=tipo), np.array([], dtype=tipo), np.array([], dtype=int)
+    return (testados,) + tuple(np.concatenate(m) for m in maus)
+
+
+def traco_eea(a, b, bits=N, ext=None):
+    # os estados do EEA a partir de (a, b), no formato de traco_refutacao: valores sem sinal
+    # de (r, rp, s, sp, t, tp, a, b), até r == 0 ou rp == 0
+    tipo = _inteiros_eea(bits)
+    estado = tuple(np.array([v], dtype=tipo) for v in (a, b, 1, 0, 0, 1))
+    mascara = (1 << bits) - 1
+    while True:
+        yield tuple(int(v[0]) & mascara for v in estado) + (int(a), int(b))
+        if estado[0][0] == 0 or estado[1][0] == 0:
+            return
+        estado, _ = passo_eea(*estado, bits=bits, ext=ext)
+
+
+def bmc(T, k, timeout_ms=10000):
+    # procura um caminho de Init até Bad com no máximo k transições;
+    # devolve (resultado, profundidade, modelo, frames)
+    s = z3.Solver()
+    s.set('timeout', timeout_ms)
+    s.add(T.at(T.Init, 0))
+    for i in range(k + 1):
+        if i > 0:
+            s.add(T.tr_at(i - 1))
+        res = s.check(T.at(T.Bad, i))
+        if res != z3.unsat:
+            return res, i, (s.model() if res == z3.sat else None), [T.frame(j) for j in range(i + 1)]
+    return z3.unsat, k, None, [T.frame(j) for j in range(k + 1)]
+
+
+def sem_quantificadores(f):
+    # o Spacer pode devolver interpolantes com Exists; elimina-os para R continuar sem quantificadores
+    return z3.Then('qe', 'simplify')(f).as_expr()
+
+
+def interpolante(A, B, fraco=False, timeout_ms=10000, cache=None):
+    # fraco: interpolante de (B, A) negado; o Spacer tende a devolver a imagem exata do lado
+    # esquerdo, portanto este é o mais fraco dos dois (o mais próximo de Not(B))
+    if fraco:
+        J = interpolate(B, A, timeout_ms=timeout_ms, cache=cache)
+        return None if J is None else sem_quantificadores(z3.Not(J))
+    I = interpolate(A, B, timeout_ms=timeout_ms, cache=cache)
+    return None if I is None else sem_quantificadores(I)
+
+
+def imc(T, k_max=20, timeout_ms=10000, fraco=True, max_iter=50):
+    # model checking por interpolação (McMillan): R começa em Init; com o desenrolamento
+    # A = R(s0) /\ Tr(s0, s1) e B = Tr(s1, s2) /\ ... /\ Tr(s_{k-1}, s_k) /\ (Bad(s1) \/ ... \/ Bad(s_k)),
+    # o interpolante de (A, B) sobre s1 sobre-aproxima os sucessores de R sem chegar a Bad em k-1
+    # passos. Se o interpolante já está contido em R, R é um invariante indutivo (prova ilimitada);
+    # se A /\ B é satisfazível a partir de Init o erro é real, senão k cresce.
+    # Com estado infinito a sequência de R pode não convergir: ao fim de max_iter interpolantes k
+    # também cresce. Por omissão usa o interpolante mais fraco (ver interpolante): os mais fortes
+    # reproduzem as imagens exatas e R cresce um estado de cada vez.
+    # Devolve ("seguro", invariante, k), ("inseguro", profundidade, k) ou ("inconclusivo", None, k)
+    def resolver(*fs):
+        s = z3.Solver()
+        s.set('timeout', timeout_ms)
+        s.add(*fs)
+        return s.check(), s
+
+    def satisfazivel(*fs):
+        return resolver(*fs)[0]
+
+    if satisfazivel(T.at(T.Init, 0), T.at(T.Bad, 0)) == z3.sat:
+        return "inseguro", 0, 0
+    # cache de free_arith_vars só desta execução: os A e B de cada iteração não ficam na global
+    cache = {}
+    for k in range(1, k_max + 1):
+        B = z3.And(list(T.unroll(k, 1)) + [z3.Or([T.at(T.Bad, i) for i in range(1, k + 1)])])
+        R = T.Init
+        for _ in range(max_iter):
+            A = z3.And(T.at(R, 0), T.tr_at(0))
+            res, s = resolver(A, B)
+            if res == z3.sat:
+                if R is T.Init:
+                    # a profundidade sai do próprio modelo: o primeiro Bad(s_i) verdadeiro
+                    m = s.model()
+                    prof = min(i for i in range(1, k + 1)
+                               if z3.is_true(m.eval(T.at(T.Bad, i), model_completion=True)))
+                    return "inseguro", prof, k
+                break
+            if res != z3.unsat:
+                return "inconclusivo", None, k
+            I = interpolante(A, B, fraco, timeout_ms, cache)
+            if I is None:
+                return "inconclusivo", None, k
+            I = z3.substitute(I, list(zip(T.frame(1), T.pre_vars())))
+            if satisfazivel(I, z3.Not(R)) == z3.unsat:
+                return "seguro", R, k
+            R = z3.simplify(z3.Or(R, I))
+    return "inconclusivo", None, k_max
+
+
+def _termo_linear(e):
+    # e = soma(coef * variável) + constante; devolve ({get_id(): (variável, coef)}, constante)
+    if z3.is_int_value(e):
+        return {}, Fraction(e.as_long())
+    if z3.is_rational_value(e):
+        return {}, Fraction(e.numerator_as_long(), e.denominator_as_long())
+    if z3.is_const(e) and e.decl().kind() == z3.Z3_OP_UNINTERPRETED:
+        return {e.get_id(): (e, Fraction(1))}, Fraction(0)
+    if z3.is_app_of(e, z3.Z3_OP_UMINUS):
+        return _escalar(_termo_linear(e.arg(0)), -1)
+    if z3.is_add(e) or z3.is_sub(e):
+        termos = [_termo_linear(c) for c in e.children()]
+        return _somar(termos[0], *(_escalar(t, -1 if z3.is_sub(e) else 1) for t in termos[1:]))
+    if z3.is_mul(e):
+        termos = [_termo_linear(c) for c in e.children()]
+        variaveis = [t for t in termos if t[0]]
+        if len(variaveis) > 1:
+            raise ValueError(f"termo não linear: {e}")
+        k = Fraction(1)
+        for cs, const in termos:
+            if not cs:
+                k *= const
+        return _escalar(variaveis[0] if variaveis else ({}, Fraction(1)), k)
+    if z3.is_div(e):
+        num, den = _termo_linear(e.arg(0)), _termo_linear(e.arg(1))
+        if den[0] or den[1] == 0:
+            raise ValueError(f"termo não linear: {e}")
+        return _escalar(num, 1 / den[1])
+    if z3.is_to_real(e):
+        return _termo_linear(e.arg(0))
+    raise ValueError(f"termo não linear: {e}")
+
+
+def _escalar(termo, k):
+    coefs, const = termo
+    return {i: (v, c * k) for i, (v, c) in coefs.items()}, const * k
+
+
+def _somar(*termos):
+    coefs, const = {}, Fraction(0)
+    for cs, k in termos:
+        for i, (v, c) in cs.items():
+            coefs[i] = (v, coefs.get(i, (v, 0))[1] + c)
+        const += k
+    return coefs, const
+
+
+def _dnf(f):
+    # lista de disjuntos, cada um uma lista de átomos (a, op, b) com op em '<=', '<', '=='
+    if z3.is_true(f):
+        return [[]]
+    if z3.is_false(f):
+        return []
+    if z3.is_and(f):
+        disjuntos = [[]]
+        for c in f.children():
+            disjuntos = [d + e for d in disjuntos for e in _dnf(c)]
+        return disjuntos
+    if z3.is_or(f):
+        return [d for c in f.children() for d in _dnf(c)]
+    if z3.is_app_of(f, z3.Z3_OP_ITE) and z3.is_bool(f):
+        c, a, b = f.children()
+        return _dnf(z3.Or(z3.And(c, a), z3.And(z3.Not(c), b)))
+    if z3.is_implies(f):
+        return _dnf(z3.Or(z3.Not(f.arg(0)), f.arg(1)))
+    if z3.is_not(f):
+        g = f.arg(0)
+        if z3.is_and(g):
+            return _dnf(z3.Or([z3.Not(c) for c in g.children()]))
+        if z3.is_or(g):
+            return _dnf(z3.And([z3.Not(c) for c in g.children()]))
+        if z3.is_not(g):
+            return _dnf(g.arg(0))
+        if z3.is_le(g):
+            return [[(g.arg(1), '<', g.arg(0))]]
+        if z3.is_lt(g):
+            return [[(g.arg(1), '<=', g.arg(0))]]
+        if z3.is_ge(g):
+            return [[(g.arg(0), '<', g.arg(1))]]
+        if z3.is_gt(g):
+            return [[(g.arg(0), '<=', g.arg(1))]]
+        if z3.is_eq(g) and not z3.is_bool(g.arg(0)):
+            return [[(g.arg(0), '<', g.arg(1))], [(g.arg(1), '<', g.arg(0))]]
+        return _nao_linear(f)
+    if z3.is_le(f):
+        return [[(f.arg(0), '<=', f.arg(1))]]
+    if z3.is_lt(f):
+        return [[(f.arg(0), '<', f.arg(1))]]
+    if z3.is_ge(f):
+        return [[(f.arg(1), '<=', f.arg(0))]]
+    if z3.is_gt(f):
+        return [[(f.arg(1), '<', f.arg(0))]]
+    if z3.is_eq(f) and not z3.is_bool(f.arg(0)):
+        return [[(f.arg(0), '==', f.arg(1))]]
+    if z3.is_distinct(f) and f.num_args() == 2:
+        return _dnf(z3.Not(f.arg(0) == f.arg(1)))
+    return _nao_linear(f)
+
+
+def _nao_linear(f):
+    raise ValueError(f"restrição não suportada (só aritmética linear): {f}")
+
+
+def transicoes_lineares(T):
+    # T.Tr em forma normal disjuntiva; cada disjunto não vazio é um poliedro dado por linhas
+    # (coeficientes, b) com soma(coef * z) <= b. Com inteiros, a < b passa a a - b <= -1;
+    # com reais fica a <= b (relaxar uma hipótese não compromete a prova)
+    transicoes = []
+    for disjunto in _dnf(T.Tr):
+        # disjuntos vazios (guarda contraditória) não contam: Farkas não os certificaria
+        vazio = z3.Solver()
+        vazio.add([{'<=': a <= b, '<': a < b, '==': a == b}[op] for a, op, b in disjunto])
+        if vazio.check() == z3.unsat:
+            continue
+        linhas = []
+        for a, op, b in disjunto:
+            coefs, const = _somar(_termo_linear(a), _escalar(_termo_linear(b), -1))
+            if any(not (v.is_int() or v.is_real()) for v, _ in coefs.values()):
+                _nao_linear(a <= b)
+            inteiro = const.denominator == 1 and all(v.is_int() and c.denominator == 1 for v, c in coefs.values())
+            limite = -const - (1 if op == '<' and inteiro else 0)
+            linhas.append((coefs, limite))
+            if op == '==':
+                linhas.append(_escalar((coefs, limite), -1))
+        transicoes.append(linhas)
+    return transicoes
+
+
+def _farkas(linhas, alvo, d, nome):
+    # lema de Farkas: se existem lambda >= 0 com lambda^T A = alvo e lambda^T b <= d, então
+    # A z <= b implica alvo . z <= d. alvo: {get_id(): (variável, coeficiente z3)}
+    lambdas = [z3.Real(f'{nome}_{k}') for k in range(len(linhas))]
+    ids = {i: v for coefs, _ in linhas for i, (v, _) in coefs.items()}
+    ids.update({i: v for i, (v, _) in alvo.items()})
+    restricoes = [l >= 0 for l in lambdas]
+    for i in ids:
+        soma = z3.Sum([l * z3.RealVal(coefs[i][1]) for l, (coefs, _) in zip(lambdas, linhas) if i in coefs] +
+                      [z3.RealVal(0)])
+        restricoes.append(soma == (alvo[i][1] if i in alvo else 0))
+    restricoes.append(z3.Sum([l * z3.RealVal(b) for l, (_, b) in zip(lambdas, linhas)] + [z3.RealVal(0)]) <= d)
+    return z3.And(restricoes)
+
+
+def ranking_lexicografico(T, timeout_ms=10000):
+    # síntese de funções de ranking lineares lexicográficas para T.Tr (aritmética linear, em DNF).
+    # Cada componente f(x) = c . x + c0 sai de uma só consulta Optimize: f não aumenta em nenhuma
+    # transição ainda por ordenar e, com o máximo de transições possível, decresce pelo menos 1 e é
+    # >= 0 no pré-estado; as implicações universais passam a existenciais pelo lema de Farkas.
+    # As transições onde f decresce saem e repete-se até não sobrar nenhuma.
+    # Só suporta sistemas lineares sobre Int/Real: variáveis BitVec ou Bool (ou termos não
+    # lineares) dão ValueError.
+    # Devolve ("termina", componentes, consultas) ou ("desconhecido", componentes até aí, consultas)
+    transicoes = transicoes_lineares(T)
+    restantes = list(range(len(transicoes)))
+    componentes = []
+    consultas = 0
+    while restantes:
+        n = len(componentes)
+        c = [z3.Int(f'rank{n}_c{i}') for i in range(len(T.pre_vars()))]
+        c0 = z3.Int(f'rank{n}_c0')
+        # f(x) - f(x') >= delta  <=>  -c.x + c.x' <= -delta ;  f(x) >= 0  <=>  -c.x <= c0
+        descida = {v.get_id(): (v, -ci) for v, ci in zip(T.pre_vars(), c)}
+        descida.update({v.get_id(): (v, ci) for v, ci in zip(T.post_vars(), c)})
+        limite = {v.get_id(): (v, -ci) for v, ci in zip(T.pre_vars(), c)}
+        o = z3.Optimize()
+        o.set('timeout', timeout_ms)
+        estrita = {}
+        for i in restantes:
+            nome = f'rank{n}_t{i}'
+            o.add(_farkas(transicoes[i], descida, 0, nome + '_nao_aumenta'))
+            estrita[i] = z3.Bool(nome + '_decresce')
+            o.add(z3.Implies(estrita[i], z3.And(_farkas(transicoes[i], descida, -1, nome + '_decresce'),
+                                                 _farkas(transicoes[i], limite, c0, nome + '_limitada'))))
+            o.add_soft(estrita[i])
+        consultas += 1
+        if o.check() != z3.sat:
+            return "desconhecido", componentes, consultas
+        m = o.model()
+        ordenadas = [i for i in restantes if z3.is_true(m.eval(estrita[i]))]
+        if not ordenadas:
+            return "desconhecido", componentes, consultas
+        componentes.append(z3.simplify(z3.Sum([m.eval(ci) * v for ci, v in zip(c, T.pre_vars())]) + m.eval(c0)))
+        restantes = [i for i in restantes if i not in ordenadas]
+    return "termina", componentes, consultas
+
+
+def varrimento_larguras(larguras=(8, 16, 32, 64), k_bmc=10, timeout_ms=30000, exts=(None,)):
+    # CHC (Spacer) e BMC para cada largura; ext None usa largura_estendida(bits)
+    print(f"{'bits':>5} {'ext':>5} {'chc':>8} {'t_chc':>9} {'bmc':>8} {'prof':>5} {'t_bmc':>9}")
+    linhas = []
+    for bits in larguras:
+        for ext in exts:
+            ext_efetivo = ext or largura_estendida(bits)
+            if ext_efetivo < largura_estendida(bits):
+                continue
+            T = create_eea_system(bits, ext_efetivo)
+            vcs, _ = vc_gen(T)
+            inicio = time.perf_counter()
+            res_chc, _ = solve_horn(vcs, timeout_ms=timeout_ms)
+            t_chc = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            res_bmc, prof, _, _ = bmc(T, k_bmc, timeout_ms)
+            t_bmc = time.perf_counter() - inicio
+            linha = {"bits": bits, "ext": ext_efetivo, "chc": str(res_chc), "t_chc": t_chc,
+                     "bmc": str(res_bmc), "prof": prof, "t_bmc": t_bmc}
+            linhas.append(linha)
+            print(f"{bits:>5} {ext_efetivo:>5} {linha['chc']:>8} {t_chc:>8.3f}s {linha['bmc']:>8} {prof:>5} {t_bmc:>8.3f}s",
+                  flush=True)
+    return linhas
+
+
+def main():
+    # as secções caras (corrida de perfis e varrimento de larguras) só correm a pedido
+    parser = argparse.ArgumentParser(description="TP3 Ex1: verificação do EEA com bit-vectors.")
+    parser.add_argument("--corrida", action="store_true", help="corrida de perfis do Spacer sobre o CHC")
+    parser.add_argument("--registo", help="com --corrida: ficheiro JSONL onde acrescentar o perfil vencedor")
+    parser.add_argument("--varrimento", action="store_true", help="varrimento de larguras e extensões (CHC e BMC)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"  VERIFICAÇÃO EEA: SFOTS COM BITVECTORS ({N}-bit)")
+    print("=" * 70)
+
+    T = create_eea_system(N)
+    print(f"\nSistema Criado: {T.name}")
+
+    print("\n" + "-" * 70)
+    print("  1. VERIFICAÇÃO DE INVARIANTE DE SEGURANÇA (CHCs)")
+    print("-" * 70)
+
+    # triagem concreta antes do SMT: um contra-exemplo executado dispensa o solver
+    inicio = time.perf_counter()
+    testados, A, B, P = fuzz_eea(N)
+    print(f"Triagem concreta: {testados} pares (a, b), {len(A)} violações "
+          f"({time.perf_counter() - inicio:.3f}s)")
+
+    if len(A):
+        i = int(np.argmin(P))
+        print("\n✗ SISTEMA INSEGURO (contra-exemplo concreto, sem SMT)")
+        print(f"  a={A[i]}, b={B[i]}: r=0 ou overflow ao fim de {P[i]} passos.")
+        print("  " + " ".join(f"{str(v):>7}" for v in T.pre_vars()))
+        for linha in traco_eea(A[i], B[i], N):
+            print("  " + " ".join(f"{x:>7}" for x in linha))
+    else:
+        res, ans, inv, origem = verificar_com_cache(T, timeout_ms=15000)
+
+        print(f"\nResultado: {res} ({origem})")
+
+        if res == z3.sat:
+            print("\n✓ SISTEMA SEGURO (SAT)")
+            print("  O solver encontrou um invariante que prova que r nunca é 0.")
+            if inv is not None:
+                print("\nInvariante sintetizado:")
+                print(inv)
+        elif res == z3.unsat:
+            print("\n✗ SISTEMA INSEGURO (UNSAT)")
+            print("  Existe um caminho onde r=0 ou ocorre overflow.")
+            _, linhas = contra_exemplo_chc(T, timeout_ms=15000)
+            if linhas is not None:
+                print("\nContra-exemplo (refutação do Spacer):")
+                print("  " + " ".join(f"{str(v):>7}" for v in T.pre_vars()))
+                for linha in linhas:
+                    print("  " + " ".join(f"{x:>7}" for x in linha))
+        else:
+            print("\n⚠ RESULTADO INCONCLUSIVO (UNKNOWN/TIMEOUT)")
+
+    print("\n" + "-" * 70)
+    print("  2. CÁLCULO DE INTERPOLANTE (Craig)")
+    print("-" * 70)
+
+    itp = interpolate(T.Init, T.Bad, timeout_ms=15000)
+
+    if itp is not None:
+        print("✓ Interpolante encontrado:")
+        print(f"  {itp}")
+    else:
+        print("✗ Não foi possível gerar interpolante.")
+
+    print("\n" + "-" * 70)
+    print("  3. CORRIDA DE PERFIS DO SPACER")
+    print("-" * 70)
+
+    if args.corrida:
+        vcs, _ = vc_gen(T)
+        res, perfil, _, timeout_ronda, tempo = corrida_horn(vcs, problema=T.name, registo=args.registo)
+        print(f"Resultado: {res} (perfil {perfil}, ronda de {timeout_ronda} ms, {tempo:.3f}s)")
+    else:
+        print("(desligada; usar --corrida)")
+
+    print("\n" + "-" * 70)
+    print("  4. MODEL CHECKING POR INTERPOLAÇÃO (McMillan)")
+    print("-" * 70)
+
+    inicio = time.perf_counter()
+    veredicto, detalhe, k = imc(T)
+    if veredicto == "seguro":
+        print(f"✓ Seguro com k={k}; invariante: {detalhe}")
+    elif veredicto == "inseguro":
+        print(f"✗ Erro alcançável em {detalhe} passos (k={k})")
+    else:
+        print(f"⚠ Inconclusivo (k={k})")
+    print(f"  Tempo: {time.perf_counter() - inicio:.3f}s")
+
+    print("\n" + "-" * 70)
+    print("  5. VARRIMENTO DE LARGURAS (CHC e BMC)")
+    print("-" * 70)
+
+    if args.varrimento:
+        varrimento_larguras(exts=(None, 64, 128))
+    else:
+        print("(desligado; usar --varrimento)")
+
+    print("\n" + "=" * 70)
+
+if __name__ == "__main__":
+    main()
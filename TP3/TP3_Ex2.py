@@ -1,5 +1,10 @@
+import argparse
+import time
+
 from z3 import *
 
+from TP3_Ex1 import Ts, ranking_lexicografico
+
 
 def problema_2a():
     print("--- PROBLEMA 2a: Identificação do CFA ---")
@@ -96,48 +101,270 @@ def problema_2b_kinducao():
         print(solver.model())
     solver.pop()
     
+# variantes do ciclo do EEA para a síntese de rankings; os produtos por q não são lineares e
+# ficam como variáveis livres (como no modo "linear" de SistemaEEA), e a positividade
+# r >= 0, r' >= 0 (obrigação "limitado") entra como guarda
+VARIANTES_TERMINACAO = ("resto", "subtracao", "subtracao_interna")
+
+
+def sistema_terminacao(variante="resto"):
+    T = Ts(f'EEA_{variante}')
+    r, r_new = T.add_var(IntSort(), 'r')
+    r_p, r_p_new = T.add_var(IntSort(), 'r_p')
+    if variante == "resto":
+        # o passo do EEA com a divisão euclidiana: r = q*r' + resto, 0 <= resto < |r'|
+        s, s_new = T.add_var(IntSort(), 's')
+        s_p, s_p_new = T.add_var(IntSort(), 's_p')
+        t, t_new = T.add_var(IntSort(), 't')
+        t_p, t_p_new = T.add_var(IntSort(), 't_p')
+        q_r, q_s, q_t = (T.add_input(IntSort(), n) for n in ('q_r', 'q_s', 'q_t'))
+        resto = T.add_input(IntSort(), 'resto')
+        T.Tr = And(
+            r >= 0, r_p >= 0, r_p != 0,
+            r == q_r + resto, resto >= 0, Or(And(r_p > 0, resto < r_p), And(r_p < 0, resto < -r_p)),
+            r_new == r_p, r_p_new == resto,
+            s_new == s_p, s_p_new == s - q_s,
+            t_new == t_p, t_p_new == t - q_t
+        )
+    elif variante == "subtracao":
+        # Euclides por subtrações: o maior dos dois perde o menor até ficarem iguais
+        T.Tr = And(r >= 1, r_p >= 1, Or(
+            And(r > r_p, r_new == r - r_p, r_p_new == r_p),
+            And(r_p > r, r_p_new == r_p - r, r_new == r)
+        ))
+    else:
+        # q calculado por subtrações sucessivas: resto parte de r e perde r' até ficar < r';
+        # só então (r, r') := (r', resto)
+        resto, resto_new = T.add_var(IntSort(), 'resto')
+        T.Tr = And(r_p >= 1, resto >= 0, Or(
+            And(resto >= r_p, resto_new == resto - r_p, r_new == r, r_p_new == r_p),
+            And(resto < r_p, r_new == r_p, r_p_new == resto, resto_new == r_p)
+        ))
+    return T
+
+
 def problema_2c_final():
-    print("--- PROBLEMA 2c: Verificação da Terminação (Look-aheads) ---\n")
+    print("--- PROBLEMA 2c: Verificação da Terminação (síntese de rankings) ---\n")
 
-    r, r_p = Ints('r r_p')
-    r_p_new = Int('r_p_new')
-    
-    solver = Solver()
+    # em vez de verificar r' à mão, procura funções de ranking lineares lexicográficas
+    # (uma consulta por componente) para cada variante do ciclo; a síntese só aceita sistemas
+    # lineares sobre Int/Real (com BitVec ou Bool ranking_lexicografico dá ValueError), por isso
+    # sistema_terminacao modela o ciclo com inteiros
+    todas = True
+    for variante in VARIANTES_TERMINACAO:
+        inicio = time.perf_counter()
+        veredicto, componentes, consultas = ranking_lexicografico(sistema_terminacao(variante))
+        tempo = time.perf_counter() - inicio
+        if veredicto == "termina":
+            ranking = ", ".join(str(f) for f in componentes)
+            print(f"[SUCESSO] {variante}: ranking ({ranking}) limitado e decrescente "
+                  f"({consultas} consulta(s), {tempo:.3f}s).")
+        else:
+            print(f"[FALHA] {variante}: sem ranking linear lexicográfico ({consultas} consulta(s)).")
+            todas = False
+    if todas:
+        print(">> CONCLUSÃO: O programa termina sempre.\n")
 
-    pre_condition = And(r >= 0, r_p > 0) 
 
-    q = r / r_p
-    transicao = (r_p_new == r - q * r_p)
+class SistemaEEA:
+    # o sistema de transição do EEA declarado uma única vez; os factos de fundo
+    # (pré-condição, estado inicial, transição, ...) e as obrigações de prova ficam
+    # indexados por nome para o VerificadorVC.
+    #
+    # divisao escolhe a codificação de q = r div r':
+    #   "nativa":     q = r / r_p, como em problema_2b_kinducao (aritmética não linear)
+    #   "euclidiana": q variável fresca com os axiomas da divisão euclidiana,
+    #                 r = q*r' + resto, 0 <= resto < |r'| (os produtos q*r', q*s', q*t' ficam)
+    #   "linear":     os produtos q*r', q*s', q*t' são variáveis frescas e o invariante é lido
+    #                 como identidade de combinações lineares: E(r, s, t) = a*s + b*t - r é uma
+    #                 função não interpretada com as instâncias dos lemas de linearidade de
+    #                 que a prova precisa; a obrigação "lema" prova essas instâncias uma vez
+    # k é o número de passos da k-indução (obrigação "passo")
 
-    claim_bounded = r_p_new >= 0
-    
-    solver.push()
-    solver.add(pre_condition)
-    solver.add(transicao)
-    solver.add(Not(claim_bounded)) 
+    def __init__(self, divisao="nativa", k=1):
+        self.divisao = divisao
+        self.k = k
+        self.a, self.b = Ints('a b')
+        self.estados = [self.estado(i) for i in range(k + 1)]
+        self.E = Function('E', IntSort(), IntSort(), IntSort(), IntSort())
 
-    if solver.check() == unsat:
-        print("[SUCESSO] Bounded: r' mantém-se sempre não-negativo (>= 0).")
-    else:
-        print("[FALHA] Bounded: r' pode tornar-se negativo.")
-    solver.pop()
+        a, b = self.a, self.b
+        r, r_p, s, s_p, t, t_p = self.estados[0]
+        r_p_new = self.estados[1][1]
+        transicoes = [self.transicao(i) for i in range(k)]
+        self.factos = {
+            "pre": And(a > 0, b > 0),
+            "init": And(r == a, r_p == b, s == 1, s_p == 0, t == 0, t_p == 1),
+            "transicao": transicoes[0],
+            "transicoes": And(transicoes),
+            "hipoteses": And([self.invariante(e) for e in self.estados[:k]]),
+            "positividade": And(r >= 0, r_p >= 0),
+            "guarda": r_p > 0,
+        }
+        if divisao == "linear":
+            # na inicialização s, t são constantes e a definição de E fica linear
+            self.factos["definicao"] = And(self.E(r, s, t) == a * s + b * t - r,
+                                           self.E(r_p, s_p, t_p) == a * s_p + b * t_p - r_p)
 
-    claim_decreasing = r_p_new < r_p
+        # nome -> (factos assumidos, tese)
+        base = ["pre", "init"] + (["definicao"] if divisao == "linear" else [])
+        self.obrigacoes = {
+            "base": (base, self.invariante(self.estados[0])),
+            "passo": (["pre", "hipoteses", "transicoes"], self.invariante(self.estados[k])),
+            "limitado": (["pre", "positividade", "transicao"], r_p_new >= 0),
+            "decrescente": (["pre", "guarda", "transicao"], r_p_new < r_p),
+        }
+        if divisao == "linear":
+            self.obrigacoes["lema"] = ([], self.lema_linearidade())
 
-    solver.push()
-    solver.add(pre_condition)
-    solver.add(transicao)
-    solver.add(Not(claim_decreasing)) 
+    def estado(self, i):
+        # (r, r_p, s, s_p, t, t_p) do frame i
+        return Ints(' '.join(f'{v}_{i}' for v in ('r', 'r_p', 's', 's_p', 't', 't_p')))
 
-    if solver.check() == unsat:
-        print("[SUCESSO] Decreasing: r' decresce estritamente a cada iteração.")
-        print(">> CONCLUSÃO: O programa termina sempre.\n")
+    def phi(self, r, s, t):
+        if self.divisao == "linear":
+            return self.E(r, s, t) == 0
+        return self.a * s + self.b * t == r
+
+    def invariante(self, estado):
+        r, r_p, s, s_p, t, t_p = estado
+        return And(self.phi(r, s, t), self.phi(r_p, s_p, t_p))
+
+    def transicao(self, i):
+        r, r_p, s, s_p, t, t_p = self.estados[i]
+        r_new, r_p_new, s_new, s_p_new, t_new, t_p_new = self.estados[i + 1]
+        if self.divisao == "nativa":
+            q = r / r_p
+            return And(
+                r_p != 0,
+                r_new == r_p,
+                r_p_new == r - q * r_p,
+                s_new == s_p,
+                s_p_new == s - q * s_p,
+                t_new == t_p,
+                t_p_new == t - q * t_p
+            )
+        q, resto = Ints(f'q_{i} resto_{i}')
+        if self.divisao == "euclidiana":
+            q_r, q_s, q_t = q * r_p, q * s_p, q * t_p
+            lemas = []
+        else:
+            q_r, q_s, q_t, q_e = Ints(f'q_r_{i} q_s_{i} q_t_{i} q_e_{i}')
+            e_p = self.E(r_p, s_p, t_p)
+            lemas = [
+                self.E(r - q_r, s - q_s, t - q_t) == self.E(r, s, t) - q_e,
+                Implies(e_p == 0, q_e == 0),
+            ]
+        return And([
+            r_p != 0,
+            r == q_r + resto, resto >= 0, resto < If(r_p > 0, r_p, -r_p),
+            r_new == r_p,
+            r_p_new == resto,
+            s_new == s_p,
+            s_p_new == s - q_s,
+            t_new == t_p,
+            t_p_new == t - q_t
+        ] + lemas)
+
+    def lema_linearidade(self):
+        # as instâncias usadas pelo modo "linear" são válidas com E(r, s, t) = a*s + b*t - r
+        # e q_r, q_s, q_t, q_e os produtos por q (identidade polinomial)
+        a, b = self.a, self.b
+        r, r_p, s, s_p, t, t_p = self.estados[0]
+        q = Int('q_lema')
+        e = lambda r, s, t: a * s + b * t - r
+        return And(
+            e(r - q * r_p, s - q * s_p, t - q * t_p) == e(r, s, t) - q * e(r_p, s_p, t_p),
+            Implies(e(r_p, s_p, t_p) == 0, q * e(r_p, s_p, t_p) == 0)
+        )
+
+
+class VerificadorVC:
+    # um único Solver para todas as obrigações: cada facto e cada negação de tese
+    # ficam guardados por um literal, e cada obrigação é um check sob assunções
+
+    def __init__(self, sistema=None, timeout_ms=None):
+        self.sistema = sistema or SistemaEEA()
+        self.solver = Solver()
+        if timeout_ms is not None:
+            self.solver.set("timeout", timeout_ms)
+        self.lits_factos = {}
+        for nome, facto in self.sistema.factos.items():
+            self.lits_factos[nome] = Bool(f"facto_{nome}")
+            self.solver.add(Implies(self.lits_factos[nome], facto))
+        self.lits_obrigacoes = {}
+        for nome, (_, tese) in self.sistema.obrigacoes.items():
+            self.lits_obrigacoes[nome] = Bool(f"obrigacao_{nome}")
+            self.solver.add(Implies(self.lits_obrigacoes[nome], Not(tese)))
+
+    def verificar(self, nome):
+        # (resultado, tempo); unsat = obrigação provada
+        factos, _ = self.sistema.obrigacoes[nome]
+        assuncoes = [self.lits_factos[f] for f in factos] + [self.lits_obrigacoes[nome]]
+        inicio = time.perf_counter()
+        res = self.solver.check(*assuncoes)
+        return res, time.perf_counter() - inicio
+
+    def verificar_todas(self, nomes=None):
+        return {nome: self.verificar(nome) for nome in (nomes or self.sistema.obrigacoes)}
+
+
+def verificar_obrigacao(args):
+    # para o pool: os objetos do z3 não passam entre processos, cada um constrói o seu sistema
+    nome, divisao = args
+    res, tempo = VerificadorVC(SistemaEEA(divisao)).verificar(nome)
+    return nome, str(res), tempo
+
+
+def verificar_paralelo(nomes=None, processos=None, divisao="nativa"):
+    import multiprocessing
+    nomes = nomes or list(SistemaEEA(divisao).obrigacoes)
+    with multiprocessing.get_context("spawn").Pool(processos) as pool:
+        resultados = pool.imap_unordered(verificar_obrigacao, [(nome, divisao) for nome in nomes])
+        return {nome: (res, tempo) for nome, res, tempo in resultados}
+
+
+def problema_2_vc(paralelo=False, divisao="nativa"):
+    print(f"--- PROBLEMA 2: Obrigações de prova (um solver, assunções, divisão {divisao}) ---\n")
+    inicio = time.perf_counter()
+    if paralelo:
+        resultados = verificar_paralelo(divisao=divisao)
     else:
-        print("[FALHA] Decreasing: r' não decresce necessariamente.")
-    solver.pop()
+        resultados = VerificadorVC(SistemaEEA(divisao)).verificar_todas()
+    for nome, (res, tempo) in resultados.items():
+        estado = "SUCESSO" if str(res) == "unsat" else "FALHA"
+        print(f"[{estado}] {nome:<12} {str(res):<8} {tempo:.3f}s")
+    print(f"Total: {time.perf_counter() - inicio:.3f}s ({'paralelo' if paralelo else 'sequencial'})\n")
+    return resultados
+
+
+def comparar_codificacoes(ks=(1, 2, 4, 8, 16), modos=("nativa", "euclidiana", "linear"), timeout_ms=20000):
+    # tempo da obrigação "passo" da k-indução em cada codificação da divisão, à medida que
+    # as fórmulas crescem com k (o lema do modo linear não depende de k)
+    print("--- Codificações da divisão: passo da k-indução ---\n")
+    print(f"{'k':>4} " + " ".join(f"{m:>18}" for m in modos))
+    for k in ks:
+        celulas = []
+        for modo in modos:
+            res, tempo = VerificadorVC(SistemaEEA(modo, k), timeout_ms).verificar("passo")
+            celulas.append(f"{str(res)} {tempo:.3f}s")
+        print(f"{k:>4} " + " ".join(f"{c:>18}" for c in celulas))
+    res, tempo = VerificadorVC(SistemaEEA("linear"), timeout_ms).verificar("lema")
+    print(f"\nlema de linearidade: {res} ({tempo:.3f}s)\n")
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TP3 Ex2: correção e terminação do EEA.")
+    parser.add_argument("--comparar", action="store_true",
+                        help="comparar as codificações da divisão com k-indução até k=16 (timeouts de 20 s)")
+    args = parser.parse_args()
+
     problema_2a()
     problema_2b_kinducao()
     problema_2c_final()
+    problema_2_vc()
+    problema_2_vc(paralelo=True)
+    problema_2_vc(divisao="linear")
+    if args.comparar:
+        comparar_codificacoes()
     print("--- Verificação Concluída ---")
\ No newline at end of file